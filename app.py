@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 
@@ -66,4 +67,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     raise SystemExit(main())
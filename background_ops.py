@@ -0,0 +1,122 @@
+from typing import Any, Callable, Optional
+
+from PyQt5 import QtCore, QtWidgets
+
+ProgressCallback = Callable[[int, int, str], None]
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class BackgroundTask(QtCore.QObject):
+    progressed = QtCore.pyqtSignal(int, int, str)
+    succeeded = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, job: Callable[[ProgressCallback], Any]) -> None:
+        super().__init__()
+        self.job = job
+        self.cancel_requested = False
+
+    def report(self, done: int, total: int, label: str = "") -> None:
+        if self.cancel_requested:
+            raise TaskCancelled()
+        self.progressed.emit(done, total, label)
+
+    @QtCore.pyqtSlot()
+    def run(self) -> None:
+        try:
+            result = self.job(self.report)
+        except TaskCancelled:
+            self.cancelled.emit()
+        except Exception as exc:
+            self.failed.emit(str(exc))
+        else:
+            self.succeeded.emit(result)
+
+
+class BackgroundRunner(QtCore.QObject):
+    def __init__(
+        self,
+        view: QtWidgets.QWidget,
+        title: str,
+        job: Callable[[ProgressCallback], Any],
+        on_done: Callable[[Any], None],
+    ) -> None:
+        super().__init__(view)
+        self.view = view
+        self.title = title
+        self.on_done = on_done
+
+        self.dialog = QtWidgets.QProgressDialog(title, "Cancel", 0, 100, view)
+        self.dialog.setWindowTitle(title)
+        self.dialog.setWindowModality(QtCore.Qt.WindowModal)
+        self.dialog.setMinimumDuration(300)
+        self.dialog.setAutoClose(False)
+        self.dialog.setAutoReset(False)
+        self.dialog.canceled.connect(self.cancel)
+
+        self.thread = QtCore.QThread(self)
+        self.task = BackgroundTask(job)
+        self.task.moveToThread(self.thread)
+        self.thread.started.connect(self.task.run)
+        self.task.progressed.connect(self.on_progress)
+        self.task.succeeded.connect(self.on_succeeded)
+        self.task.failed.connect(self.on_failed)
+        self.task.cancelled.connect(self.on_cancelled)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    @QtCore.pyqtSlot()
+    def cancel(self) -> None:
+        self.task.cancel_requested = True
+        self.dialog.setLabelText("Cancelling...")
+
+    @QtCore.pyqtSlot(int, int, str)
+    def on_progress(self, done: int, total: int, label: str) -> None:
+        if self.task.cancel_requested:
+            return
+        if label:
+            self.dialog.setLabelText(label)
+        self.dialog.setValue(int(100 * done / total) if total > 0 else 0)
+
+    def _finish(self) -> None:
+        self.dialog.canceled.disconnect(self.cancel)
+        self.dialog.close()
+        self.thread.quit()
+        self.thread.wait()
+        self.task.deleteLater()
+        if getattr(self.view, "backgroundRunner", None) is self:
+            self.view.backgroundRunner = None
+        self.deleteLater()
+
+    @QtCore.pyqtSlot(object)
+    def on_succeeded(self, result: Any) -> None:
+        self._finish()
+        self.on_done(result)
+
+    @QtCore.pyqtSlot(str)
+    def on_failed(self, message: str) -> None:
+        self._finish()
+        QtWidgets.QMessageBox.warning(self.view, self.title, message)
+
+    @QtCore.pyqtSlot()
+    def on_cancelled(self) -> None:
+        self._finish()
+
+
+def run_in_background(
+    view,
+    title: str,
+    job: Callable[[ProgressCallback], Any],
+    on_done: Callable[[Any], None],
+) -> Optional[BackgroundRunner]:
+    if getattr(view, "backgroundRunner", None) is not None:
+        return None
+    runner = BackgroundRunner(view, title, job, on_done)
+    view.backgroundRunner = runner
+    runner.start()
+    return runner
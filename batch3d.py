@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import os
+
 from PyQt5 import QtCore, QtWidgets, uic
 
+from dat_reader import COMPRESSED_OPENERS
+from vtk_dataset_ops import clear_datasets, dataset_image, write_dataset
+
 
 class Batch3D(QtWidgets.QDialog):
     def __init__(self, simple_view, parent: QtWidgets.QWidget | None = None) -> None:
@@ -33,7 +38,13 @@ class Batch3D(QtWidgets.QDialog):
         return f"{file_name}.{time_step:08d}"
 
     def formDataName(self, file_name: str, time_step: int) -> str:
-        return f"{file_name}.{time_step:08d}.dat"
+        data_name = f"{file_name}.{time_step:08d}.dat"
+        if os.path.isfile(data_name):
+            return data_name
+        for suffix in COMPRESSED_OPENERS:
+            if os.path.isfile(data_name + suffix):
+                return data_name + suffix
+        return data_name
 
     def on_loadStatusFile_PB_released(self) -> None:
         self.status_file = self.main3d.slotLoadStatus()
@@ -161,6 +172,7 @@ class Batch3D(QtWidgets.QDialog):
                 self.main3d.loadData(domain_data)
                 domain_name = f"{self.export_dir}/domain/{self.ui.domainName_LB.text()}"
                 domain_out = self.formName(domain_name, i)
+                clear_datasets(self.main3d, "domain")
                 self.main3d.outputDomain(
                     domain_out,
                     self.main3d.tempX - 1,
@@ -168,6 +180,7 @@ class Batch3D(QtWidgets.QDialog):
                     self.main3d.tempZ - 1,
                 )
                 domain_vtk = f"{domain_out}.domain.vtk"
+                write_dataset(dataset_image(self.main3d, domain_vtk), domain_vtk)
                 self.main3d.drawDomain(domain_vtk)
 
             self.main3d.updateVTK(scalar_name, vector_name)
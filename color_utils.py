@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import math
-from typing import Sequence
+from typing import Optional, Sequence
+
+import numpy as np
 
 from constants import PI_VALUE
 
@@ -66,3 +68,72 @@ def get_rgb(
         saturation = rescale(magnitude, magnitude_range)
         lightness = (pz / magnitude + 1) / 2.0 if magnitude != 0 else 0.5
     return convert_hsl_to_rgb(hue, saturation, lightness)
+
+
+def rescale_array(values: np.ndarray, value_range: Sequence[float]) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    if value_range[1] - value_range[0] < 1.0e-6:
+        return np.full(values.shape, 0.5)
+    scaled = (values - value_range[0]) / (value_range[1] - value_range[0])
+    scaled = np.where(values <= value_range[0], 0.0, scaled)
+    return np.where(values >= value_range[1], 1.0, scaled)
+
+
+def _hue_to_rgb_array(v1: np.ndarray, v2: np.ndarray, vh: np.ndarray) -> np.ndarray:
+    vh = np.where(vh < 0, vh + 1, vh)
+    vh = np.where(vh > 1, vh - 1, vh)
+    return np.select(
+        [(6 * vh) < 1, (2 * vh) < 1, (3 * vh) < 2],
+        [v1 + (v2 - v1) * 6 * vh, v2, v1 + (v2 - v1) * ((2 / 3.0) - vh) * 6],
+        v1,
+    )
+
+
+def convert_hsl_to_rgb_array(hue: np.ndarray, saturation: np.ndarray, lightness: np.ndarray) -> np.ndarray:
+    hue, saturation, lightness = np.broadcast_arrays(
+        np.asarray(hue, dtype=np.float64),
+        np.asarray(saturation, dtype=np.float64),
+        np.asarray(lightness, dtype=np.float64),
+    )
+    v2 = np.where(
+        lightness < 0.5,
+        lightness * (1 + saturation),
+        (lightness + saturation) - (saturation * lightness),
+    )
+    v1 = 2 * lightness - v2
+    rgb = np.stack(
+        (
+            255 * _hue_to_rgb_array(v1, v2, hue / 360.0 + (1 / 3.0)),
+            255 * _hue_to_rgb_array(v1, v2, hue / 360.0),
+            255 * _hue_to_rgb_array(v1, v2, hue / 360.0 - (1 / 3.0)),
+        ),
+        axis=-1,
+    )
+    gray = saturation <= 1.0e-6
+    rgb[gray] = (lightness[gray] * 255)[:, None]
+    return rgb
+
+
+def get_rgb_array(
+    vectors: np.ndarray,
+    magnitude_range: Sequence[float],
+    z_range: Sequence[float],
+    magnitude: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float64).reshape(-1, 3)
+    px = vectors[:, 0]
+    py = vectors[:, 1]
+    pz = vectors[:, 2]
+    xy_square = px * px + py * py
+    xy_magnitude = np.sqrt(xy_square)
+    in_plane = xy_magnitude >= 1.0e-6
+    if magnitude is None:
+        magnitude = np.sqrt(xy_square + pz * pz)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.where(in_plane, np.clip(px / xy_magnitude, -1.0, 1.0), 1.0)
+        tilt = (pz / magnitude + 1) / 2.0
+    angle = np.arccos(cosine) / PI_VALUE * 180
+    hue = np.where(in_plane, np.where(py >= 0, angle, 360 - angle), 0.0)
+    saturation = np.where(in_plane, rescale_array(magnitude, magnitude_range), 0.0)
+    lightness = np.where(in_plane, tilt, rescale_array(pz, z_range))
+    return convert_hsl_to_rgb_array(hue, saturation, lightness)
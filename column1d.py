@@ -2,6 +2,7 @@ from typing import List, Optional
 
 from PyQt5 import QtCore, QtGui, QtWidgets, uic
 
+from dat_reader import open_text
 from plot_widget import QCPScatterStyle
 
 
@@ -171,7 +172,7 @@ class Column1D(QtWidgets.QWidget):
         self.figureReplot.emit()
 
     def loadData1D(self, filedir: str) -> int:
-        with open(filedir, "r", encoding="utf-8") as f:
+        with open_text(filedir) as f:
             lines = [line.strip() for line in f if line.strip()]
 
         if len(lines) < 2:
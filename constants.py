@@ -1,8 +1,33 @@
 import math
+import os
 
 
 PI_VALUE = 3.141592653589
 
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "mupro-visualization")
+DAT_CACHE_DIR = os.path.join(CACHE_ROOT, "dat")
+DAT_CACHE_MAX_BYTES = 8 * 1024 ** 3
+DAT_CACHE_MIN_SOURCE_BYTES = 1024 ** 2
+DAT_PARSE_WORKERS = 0
+DAT_SCRATCH_DIR = os.path.join(CACHE_ROOT, "scratch")
+DAT_PARALLEL_MIN_BYTES = 32 * 1024 ** 2
+VTK_BINARY_OUTPUT = True
+VTK_DATASET_CACHE_SIZE = 4
+VTK_CACHE_DIR = os.path.join(CACHE_ROOT, "vtk")
+VTK_CACHE_MAX_BYTES = 4 * 1024 ** 3
+VTK_CONVERT_WORKERS = 0
+VTK_CONVERT_MEMORY_LIMIT = 2 * 1024 ** 3
+DOMAIN_STANDARD_VALUE = 0.3
+DOMAIN_STANDARD_ANGLE = 180.0
+DOMAIN_LOOKUP_CLASSIFY = False
+# Cells per cube-face edge; domain_lookup_error(256) is about 0.32 degrees.
+DOMAIN_LOOKUP_RESOLUTION = 256
+DOMAIN_SURFACE_MODE = "discrete"
+DOMAIN_SMOOTH_ITERATIONS = 30
+DOMAIN_SMOOTH_RELAXATION = 0.1
+DOMAIN_SURFACE_WORKERS = 0
+DOMAIN_SURFACE_CACHE_BYTES = 512 * 1024 ** 2
+
 DOMAIN_ORTH = [
     [0, 0, 0],
     [1 / math.sqrt(3), 1 / math.sqrt(3), 1 / math.sqrt(3)],
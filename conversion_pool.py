@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from constants import VTK_CONVERT_MEMORY_LIMIT, VTK_CONVERT_WORKERS
+from data_io_ops import scalar_volume, vector_arrays
+from field_store import FieldStore
+
+ConversionJob = tuple[str, tuple[int, ...], tuple[bool, bool, bool]]
+ConvertedArrays = tuple[tuple[int, int, int], dict[str, np.ndarray]]
+
+
+def scalar_job(column_number: int, doubled: Sequence[bool]) -> ConversionJob:
+    return "scalar", (int(column_number),), (bool(doubled[0]), bool(doubled[1]), bool(doubled[2]))
+
+
+def vector_job(col_x: int, col_y: int, col_z: int) -> ConversionJob:
+    return "vector", (int(col_x), int(col_y), int(col_z)), (False, False, False)
+
+
+def job_bytes(dims: Sequence[int], job: ConversionJob) -> int:
+    kind, _columns, doubled = job
+    points = 1
+    for size, double in zip(dims, doubled):
+        points *= size * (2 if double else 1)
+    if kind == "scalar":
+        return points * 4
+    return points * (4 + 12 + 3)
+
+
+def convert_arrays(data: np.ndarray, dims: Sequence[int], job: ConversionJob) -> ConvertedArrays:
+    kind, columns, doubled = job
+    store = FieldStore(data, dims)
+    if kind == "scalar":
+        volume = scalar_volume(store, columns[0], doubled)
+        values = np.ascontiguousarray(volume.transpose(2, 1, 0), dtype=np.float32).ravel()
+        return volume.shape, {"scalar": values}
+    vectors, magnitude, rgb = vector_arrays(store.vector_volume(*columns))
+    return store.dims, {
+        "Magnitude": magnitude.astype(np.float32),
+        "vector": vectors.astype(np.float32),
+        "RGB": np.rint(rgb).astype(np.uint8),
+    }
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _convert_shared(name: str, shape: tuple[int, int], dims: tuple[int, int, int], job: ConversionJob) -> ConvertedArrays:
+    shm = _attach_shared_memory(name)
+    data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    try:
+        return convert_arrays(data, dims, job)
+    finally:
+        del data
+        shm.close()
+
+
+def conversion_slots(
+    data: np.ndarray,
+    dims: Sequence[int],
+    jobs: Sequence[ConversionJob],
+    workers: int,
+    memory_limit: int,
+) -> int:
+    if not jobs:
+        return 0
+    largest = max(job_bytes(dims, job) for job in jobs)
+    budget = memory_limit - data.size * 8
+    if largest <= 0:
+        return min(workers, len(jobs))
+    return max(0, min(workers, len(jobs), budget // (2 * largest)))
+
+
+def convert_jobs(
+    data: np.ndarray,
+    dims: Sequence[int],
+    jobs: Sequence[ConversionJob],
+    workers: Optional[int] = None,
+    memory_limit: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> list[ConvertedArrays]:
+    if workers is None:
+        workers = VTK_CONVERT_WORKERS or os.cpu_count() or 1
+    if memory_limit is None:
+        memory_limit = VTK_CONVERT_MEMORY_LIMIT
+    data = np.asarray(data, dtype=np.float64)
+    dims = (int(dims[0]), int(dims[1]), int(dims[2]))
+    slots = conversion_slots(data, dims, jobs, workers, memory_limit)
+    results: list[Optional[ConvertedArrays]] = [None] * len(jobs)
+    if slots < 2:
+        for index, job in enumerate(jobs):
+            results[index] = convert_arrays(data, dims, job)
+            if progress is not None:
+                progress(index + 1, len(jobs))
+        return results
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+    try:
+        np.ndarray(data.shape, dtype=np.float64, buffer=shm.buf)[...] = data
+        with ProcessPoolExecutor(max_workers=slots, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = {}
+            queued = iter(enumerate(jobs))
+            done = 0
+            try:
+                for index, job in queued:
+                    pending[pool.submit(_convert_shared, shm.name, data.shape, dims, job)] = index
+                    if len(pending) >= slots:
+                        break
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        results[pending.pop(future)] = future.result()
+                        done += 1
+                        if progress is not None:
+                            progress(done, len(jobs))
+                    for index, job in queued:
+                        pending[pool.submit(_convert_shared, shm.name, data.shape, dims, job)] = index
+                        if len(pending) >= slots:
+                            break
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
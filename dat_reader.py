@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import itertools
+import lzma
+import multiprocessing
+import os
+import tempfile
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import IO, Callable, Iterable, NamedTuple, Optional
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from constants import DAT_PARALLEL_MIN_BYTES, DAT_PARSE_WORKERS, DAT_SCRATCH_DIR
+
+CHUNK_ROWS = 1 << 16
+PARALLEL_RANGES_PER_WORKER = 4
+
+
+class DatLayout(NamedTuple):
+    dims: tuple[int, int, int]
+    columns: int
+    header_lines: int
+
+    @property
+    def rows(self) -> int:
+        return self.dims[0] * self.dims[1] * self.dims[2]
+
+
+class DatRegion(NamedTuple):
+    xmin: int
+    xmax: int
+    ymin: int
+    ymax: int
+    zmin: int
+    zmax: int
+
+    @classmethod
+    def full(cls, dims: tuple[int, int, int]) -> "DatRegion":
+        return cls(1, dims[0], 1, dims[1], 1, dims[2])
+
+    def clamp(self, dims: tuple[int, int, int]) -> "DatRegion":
+        bounds = []
+        for low, high, size in (
+            (self.xmin, self.xmax, dims[0]),
+            (self.ymin, self.ymax, dims[1]),
+            (self.zmin, self.zmax, dims[2]),
+        ):
+            low = max(1, min(low, size))
+            high = max(1, min(high, size))
+            bounds.extend((min(low, high), max(low, high)))
+        return DatRegion(*bounds)
+
+    @property
+    def origin(self) -> tuple[int, int, int]:
+        return self.xmin - 1, self.ymin - 1, self.zmin - 1
+
+    @property
+    def dims(self) -> tuple[int, int, int]:
+        return self.xmax - self.xmin + 1, self.ymax - self.ymin + 1, self.zmax - self.zmin + 1
+
+
+def _open_zstd(file_path: str) -> IO[bytes]:
+    if zstandard is None:
+        raise OSError(f"zstandard is required to read {file_path}")
+    return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+
+
+COMPRESSED_OPENERS: dict[str, Callable[[str], IO[bytes]]] = {
+    ".gz": lambda file_path: gzip.open(file_path, "rb"),
+    ".xz": lambda file_path: lzma.open(file_path, "rb"),
+    ".bz2": lambda file_path: bz2.open(file_path, "rb"),
+    ".zst": _open_zstd,
+}
+
+
+def compression_suffix(file_path: str) -> str:
+    suffix = os.path.splitext(file_path)[1].lower()
+    return suffix if suffix in COMPRESSED_OPENERS else ""
+
+
+def is_compressed(file_path: str) -> bool:
+    return bool(compression_suffix(file_path))
+
+
+def strip_compression_suffix(file_path: str) -> str:
+    suffix = compression_suffix(file_path)
+    return file_path[: -len(suffix)] if suffix else file_path
+
+
+def open_text(file_path: str) -> IO[str]:
+    suffix = compression_suffix(file_path)
+    if not suffix:
+        return open(file_path, "r", encoding="utf-8", errors="ignore")
+    return io.TextIOWrapper(COMPRESSED_OPENERS[suffix](file_path), encoding="utf-8", errors="ignore")
+
+
+def _dims_from_tokens(parts: list[str]) -> tuple[int, int, int]:
+    if len(parts) < 3:
+        return 0, 0, 0
+    x, y, z = (int(float(value)) for value in parts[:3])
+    return x, y, z
+
+
+def read_last_line(file_path: str, block_size: int = 4096) -> str:
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            stripped = tail.rstrip()
+            if b"\n" in stripped:
+                return stripped.rsplit(b"\n", 1)[1].decode("utf-8", errors="ignore").strip()
+        return tail.strip().decode("utf-8", errors="ignore")
+
+
+def _read_last_line_streaming(file_path: str) -> str:
+    last = ""
+    with open_text(file_path) as f:
+        for line in f:
+            if line.strip():
+                last = line
+    return last.strip()
+
+
+def read_layout(file_path: str) -> Optional[DatLayout]:
+    with open_text(file_path) as f:
+        line1 = f.readline()
+        line2 = f.readline()
+    if not line2:
+        return None
+    parts1 = line1.split()
+    parts2 = line2.split()
+    if len(parts1) != len(parts2):
+        dims = _dims_from_tokens(parts1)
+        header_lines = 1
+    else:
+        if is_compressed(file_path):
+            last_line = _read_last_line_streaming(file_path)
+        else:
+            last_line = read_last_line(file_path)
+        dims = _dims_from_tokens(last_line.split())
+        header_lines = 0
+    return DatLayout(dims, max(len(parts2) - 3, 0), header_lines)
+
+
+def _parse_rows_tolerant(lines: Iterable[str], columns: int, max_rows: int) -> np.ndarray:
+    rows = []
+    for line in itertools.islice(lines, max_rows):
+        parts = line.split()
+        if len(parts) < 3 + columns:
+            continue
+        rows.append([float(value) for value in parts[3 : 3 + columns]])
+    return np.array(rows, dtype=np.float64).reshape(-1, columns)
+
+
+def parse_rows(lines: Iterable[str], columns: int, max_rows: int) -> np.ndarray:
+    if columns <= 0 or max_rows <= 0:
+        return np.empty((0, columns), dtype=np.float64)
+    return np.loadtxt(
+        lines,
+        dtype=np.float64,
+        usecols=range(3, 3 + columns),
+        max_rows=max_rows,
+        ndmin=2,
+    )
+
+
+def _parse_chunk(lines: list[str], columns: int) -> np.ndarray:
+    try:
+        return parse_rows(lines, columns, len(lines))
+    except ValueError:
+        return _parse_rows_tolerant(lines, columns, len(lines))
+
+
+def _parse_selected(lines: list[str], usecols: list[int]) -> np.ndarray:
+    try:
+        return np.loadtxt(lines, dtype=np.float64, usecols=usecols, ndmin=2)
+    except ValueError:
+        rows = []
+        for line in lines:
+            parts = line.split()
+            if len(parts) <= usecols[-1]:
+                continue
+            rows.append([float(parts[col]) for col in usecols])
+        return np.array(rows, dtype=np.float64).reshape(-1, len(usecols))
+
+
+def _open_output(out_path: Optional[str], shape: tuple[int, int]) -> np.ndarray:
+    if out_path:
+        return np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float64, shape=shape)
+    return np.empty(shape, dtype=np.float64)
+
+
+def read_dat_serial(
+    file_path: str,
+    out_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> tuple[Optional[np.ndarray], Optional[DatLayout]]:
+    layout = read_layout(file_path)
+    if layout is None:
+        return None, None
+    rows = layout.rows
+    data = _open_output(out_path, (rows, layout.columns))
+
+    filled = 0
+    with open_text(file_path) as f:
+        for _ in range(layout.header_lines):
+            f.readline()
+        while filled < rows:
+            lines = list(itertools.islice(f, min(chunk_rows, rows - filled)))
+            if not lines:
+                break
+            chunk = _parse_chunk(lines, layout.columns)
+            data[filled : filled + len(chunk)] = chunk
+            filled += len(chunk)
+            if progress is not None:
+                progress(filled, rows)
+    if filled < rows:
+        data = data[:filled]
+    return data, layout
+
+
+def _line_aligned_ranges(file_path: str, header_lines: int, parts: int) -> list[tuple[int, int]]:
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        for _ in range(header_lines):
+            f.readline()
+        start = f.tell()
+        step = max(1, (size - start) // max(parts, 1))
+        ranges = []
+        while start < size:
+            f.seek(min(start + step, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _count_range_lines(file_path: str, start: int, end: int) -> int:
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    count = raw.count(b"\n")
+    if raw and not raw.endswith(b"\n"):
+        count += 1
+    return count
+
+
+def _parse_range(
+    file_path: str,
+    start: int,
+    end: int,
+    columns: int,
+    row_offset: int,
+    max_rows: int,
+    out_path: str,
+) -> int:
+    out = np.load(out_path, mmap_mode="r+")
+    parsed = 0
+    try:
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            lines = f.read(end - start).decode("utf-8", errors="ignore").split("\n")
+        if lines and not lines[-1].strip():
+            lines.pop()
+        for begin in range(0, len(lines), CHUNK_ROWS):
+            if parsed >= max_rows:
+                break
+            chunk = _parse_chunk(lines[begin : begin + CHUNK_ROWS], columns)
+            take = min(len(chunk), max_rows - parsed)
+            out[row_offset + parsed : row_offset + parsed + take] = chunk[:take]
+            parsed += take
+        out.flush()
+    finally:
+        del out
+    return parsed
+
+
+def _remove_quietly(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def _scratch_path() -> str:
+    os.makedirs(DAT_SCRATCH_DIR, exist_ok=True)
+    handle, scratch_path = tempfile.mkstemp(suffix=".npy", dir=DAT_SCRATCH_DIR)
+    os.close(handle)
+    return scratch_path
+
+
+def _scratch_array(scratch_path: str) -> np.ndarray:
+    data = np.load(scratch_path, mmap_mode="r+")
+    try:
+        os.remove(scratch_path)
+    except OSError:
+        weakref.finalize(data, _remove_quietly, scratch_path)
+    return data
+
+
+def read_dat_parallel(
+    file_path: str,
+    workers: int,
+    out_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> tuple[Optional[np.ndarray], Optional[DatLayout]]:
+    layout = read_layout(file_path)
+    if layout is None:
+        return None, None
+    rows = layout.rows
+    shape = (rows, layout.columns)
+    ranges = _line_aligned_ranges(file_path, layout.header_lines, workers * PARALLEL_RANGES_PER_WORKER)
+    if rows == 0 or layout.columns == 0 or len(ranges) < 2:
+        return read_dat_serial(file_path, out_path, progress)
+
+    target = out_path or _scratch_path()
+    try:
+        np.lib.format.open_memmap(target, mode="w+", dtype=np.float64, shape=shape).flush()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            counts = list(pool.map(_count_range_lines, *zip(*[(file_path, a, b) for a, b in ranges])))
+            futures = {}
+            row_offset = 0
+            for (start, end), count in zip(ranges, counts):
+                max_rows = min(count, rows - row_offset)
+                if max_rows <= 0:
+                    break
+                future = pool.submit(
+                    _parse_range, file_path, start, end, layout.columns, row_offset, max_rows, target
+                )
+                futures[future] = max_rows
+                row_offset += max_rows
+            complete = row_offset == rows
+            filled = 0
+            try:
+                for future in as_completed(futures):
+                    parsed = future.result()
+                    complete = complete and parsed == futures[future]
+                    filled += parsed
+                    if progress is not None:
+                        progress(min(filled, rows), rows)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        if not complete:
+            if target != out_path:
+                _remove_quietly(target)
+            return read_dat_serial(file_path, out_path, progress)
+        if target != out_path:
+            return _scratch_array(target), layout
+        return np.load(out_path, mmap_mode="r+"), layout
+    except BaseException:
+        if target != out_path:
+            _remove_quietly(target)
+        raise
+
+
+def read_dat(
+    file_path: str,
+    out_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    workers: Optional[int] = None,
+) -> tuple[Optional[np.ndarray], Optional[DatLayout]]:
+    if workers is None:
+        workers = DAT_PARSE_WORKERS or os.cpu_count() or 1
+    if (
+        workers > 1
+        and not is_compressed(file_path)
+        and os.path.getsize(file_path) >= DAT_PARALLEL_MIN_BYTES
+    ):
+        return read_dat_parallel(file_path, workers, out_path, progress)
+    return read_dat_serial(file_path, out_path, progress)
+
+
+def read_dat_selection(
+    file_path: str,
+    columns: Optional[Iterable[int]] = None,
+    region: Optional[DatRegion] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> tuple[Optional[np.ndarray], Optional[DatLayout], Optional[DatRegion]]:
+    layout = read_layout(file_path)
+    if layout is None:
+        return None, None, None
+    nx, ny, nz = layout.dims
+    region = DatRegion.full(layout.dims) if region is None else region.clamp(layout.dims)
+    if columns is None:
+        columns = range(layout.columns)
+    usecols = sorted({3 + col for col in columns if 0 <= col < layout.columns})
+    if not usecols:
+        return np.empty((0, 0), dtype=np.float64), DatLayout(region.dims, 0, layout.header_lines), region
+
+    x0, y0, z0 = region.origin
+    first_line = x0 * ny * nz
+    last_line = region.xmax * ny * nz
+    rows = region.dims[0] * region.dims[1] * region.dims[2]
+    data = np.empty((rows, len(usecols)), dtype=np.float64)
+
+    filled = 0
+    line_index = first_line
+    with open_text(file_path) as f:
+        for _ in range(layout.header_lines):
+            f.readline()
+        for _ in itertools.islice(f, first_line):
+            pass
+        while line_index < last_line:
+            lines = list(itertools.islice(f, min(chunk_rows, last_line - line_index)))
+            if not lines:
+                break
+            offsets = np.arange(line_index, line_index + len(lines)) % (ny * nz)
+            j = offsets // nz
+            k = offsets % nz
+            keep = np.flatnonzero((j >= y0) & (j < region.ymax) & (k >= z0) & (k < region.zmax))
+            line_index += len(lines)
+            if keep.size == 0:
+                continue
+            chunk = _parse_selected([lines[i] for i in keep], usecols)
+            data[filled : filled + len(chunk)] = chunk
+            filled += len(chunk)
+            if progress is not None:
+                progress(filled, rows)
+    if filled < rows:
+        data = data[:filled]
+    return data, DatLayout(region.dims, len(usecols), layout.header_lines), region
+
+
+def select_from_array(
+    data: np.ndarray,
+    layout: DatLayout,
+    columns: Optional[Iterable[int]] = None,
+    region: Optional[DatRegion] = None,
+) -> tuple[np.ndarray, DatLayout, DatRegion]:
+    region = DatRegion.full(layout.dims) if region is None else region.clamp(layout.dims)
+    if columns is None:
+        columns = range(layout.columns)
+    cols = sorted({col for col in columns if 0 <= col < layout.columns})
+    x0, y0, z0 = region.origin
+    volume = np.asarray(data).reshape(layout.dims + (layout.columns,))
+    subset = volume[x0 : region.xmax, y0 : region.ymax, z0 : region.zmax][..., cols]
+    return subset.reshape(-1, len(cols)), DatLayout(region.dims, len(cols), layout.header_lines), region
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from constants import DAT_CACHE_DIR, DAT_CACHE_MAX_BYTES, DAT_CACHE_MIN_SOURCE_BYTES
+from dat_reader import DatLayout, DatRegion, read_dat, read_dat_selection, read_layout, select_from_array
+
+HEADER_HASH_BYTES = 4096
+
+
+class DiskCache:
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{key}{suffix}")
+
+    def read_meta(self, key: str) -> Optional[dict]:
+        try:
+            with open(self.path(key, ".json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_meta(self, key: str, meta: dict) -> None:
+        tmp_path = self.path(key, ".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.path(key, ".json"))
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self.path(key, ".json"))
+        except OSError:
+            pass
+
+    def _entries(self) -> dict[str, list[str]]:
+        entries: dict[str, list[str]] = {}
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return entries
+        for name in names:
+            entries.setdefault(name.split(".", 1)[0], []).append(os.path.join(self.root, name))
+        return entries
+
+    def discard(self, key: str) -> None:
+        for file_path in self._entries().get(key, []):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def evict(self, keep: str = "") -> None:
+        ranked = []
+        total = 0
+        for key, files in self._entries().items():
+            size = 0
+            for file_path in files:
+                try:
+                    size += os.path.getsize(file_path)
+                except OSError:
+                    pass
+            try:
+                last_used = os.path.getmtime(self.path(key, ".json"))
+            except OSError:
+                last_used = 0.0
+            total += size
+            ranked.append((last_used, key, size))
+        ranked.sort()
+        for _last_used, key, size in ranked:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.discard(key)
+            total -= size
+
+
+def source_signature(file_path: str) -> dict:
+    stat = os.stat(file_path)
+    with open(file_path, "rb") as f:
+        header_hash = hashlib.sha1(f.read(HEADER_HASH_BYTES)).hexdigest()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "header_sha1": header_hash}
+
+
+class DatCache(DiskCache):
+    def __init__(
+        self,
+        root: str = DAT_CACHE_DIR,
+        max_bytes: int = DAT_CACHE_MAX_BYTES,
+        min_source_bytes: int = DAT_CACHE_MIN_SOURCE_BYTES,
+    ) -> None:
+        super().__init__(root, max_bytes)
+        self.min_source_bytes = min_source_bytes
+
+    @staticmethod
+    def key_for(file_path: str) -> str:
+        return hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+
+    def load(self, file_path: str) -> tuple[Optional[np.ndarray], Optional[DatLayout]]:
+        key = self.key_for(file_path)
+        meta = self.read_meta(key)
+        if meta is None:
+            return None, None
+        try:
+            if meta.get("source") != source_signature(file_path):
+                self.discard(key)
+                return None, None
+            data = np.load(self.path(key, ".npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            self.discard(key)
+            return None, None
+        layout = DatLayout(tuple(meta["dims"]), int(meta["columns"]), int(meta["header_lines"]))
+        if data.ndim != 2 or data.shape[1] != layout.columns:
+            self.discard(key)
+            return None, None
+        self.touch(key)
+        return data, layout
+
+    def _cacheable(self, file_path: str, layout: DatLayout) -> bool:
+        if self.max_bytes <= 0 or layout.rows * layout.columns * 8 > self.max_bytes:
+            return False
+        try:
+            return os.path.getsize(file_path) >= self.min_source_bytes
+        except OSError:
+            return False
+
+    def parse(
+        self,
+        file_path: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> tuple[Optional[np.ndarray], Optional[DatLayout]]:
+        layout = read_layout(file_path)
+        if layout is None or not self._cacheable(file_path, layout):
+            return read_dat(file_path, progress=progress)
+        key = self.key_for(file_path)
+        tmp_path = self.path(key, ".tmp.npy")
+        try:
+            signature = source_signature(file_path)
+            os.makedirs(self.root, exist_ok=True)
+            data, layout = read_dat(file_path, out_path=tmp_path, progress=progress)
+            if data.shape[0] != layout.rows:
+                data = np.array(data)
+                self.discard(key)
+                return data, layout
+            data.flush()
+            del data
+            os.replace(tmp_path, self.path(key, ".npy"))
+            self.write_meta(
+                key,
+                {
+                    "source": signature,
+                    "path": os.path.abspath(file_path),
+                    "dims": list(layout.dims),
+                    "columns": layout.columns,
+                    "header_lines": layout.header_lines,
+                },
+            )
+            self.evict(keep=key)
+            return np.load(self.path(key, ".npy"), mmap_mode="r"), layout
+        except OSError:
+            self.discard(key)
+            return read_dat(file_path, progress=progress)
+        except BaseException:
+            self.discard(key)
+            raise
+
+
+dat_cache = DatCache()
+
+
+def read_dat_cached(
+    file_path: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> tuple[Optional[np.ndarray], Optional[DatLayout]]:
+    data, layout = dat_cache.load(file_path)
+    if layout is not None:
+        return data, layout
+    return dat_cache.parse(file_path, progress)
+
+
+def read_dat_subset_cached(
+    file_path: str,
+    columns: Optional[Iterable[int]] = None,
+    region: Optional[DatRegion] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> tuple[Optional[np.ndarray], Optional[DatLayout], Optional[DatRegion]]:
+    data, layout = dat_cache.load(file_path)
+    if layout is not None and data.shape[0] == layout.rows:
+        return select_from_array(data, layout, columns, region)
+    return read_dat_selection(file_path, columns, region, progress)
@@ -1,59 +1,78 @@
 import math
+import os
+from typing import Callable, Iterable, Optional, Sequence
 
-from color_utils import get_rgb
+import numpy as np
 
+from color_utils import get_rgb_array
+from constants import VTK_BINARY_OUTPUT
+from dat_reader import DatRegion
+from data_cache import read_dat_cached, read_dat_subset_cached, source_signature
+from field_store import FieldStore
 
-def load_data(view, file_path: str) -> int:
+
+def read_field_store(
+    file_path: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    columns: Optional[Iterable[int]] = None,
+    region: Optional[DatRegion] = None,
+) -> Optional[FieldStore]:
+    if columns is None and region is None:
+        data, layout = read_dat_cached(file_path, progress)
+        names = None
+        origin = (0, 0, 0)
+    else:
+        columns = None if columns is None else sorted({col for col in columns if col >= 0})
+        data, layout, region = read_dat_subset_cached(file_path, columns, region, progress)
+        names = None if columns is None else [str(col + 1) for col in columns][: layout.columns]
+        origin = region.origin if region is not None else (0, 0, 0)
+    if layout is None:
+        return None
+    store = FieldStore(data, layout.dims, names, origin)
+    store.source = dict(
+        source_signature(file_path),
+        path=os.path.abspath(file_path),
+        names=store.names,
+        origin=list(store.origin),
+        dims=list(store.dims),
+    )
+    return store
+
+
+def apply_field_store(view, store: Optional[FieldStore]) -> int:
     view.updateFlag = False
-    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-        lines = f.readlines()
-    if len(lines) < 2:
+    if store is None:
         return 0
-    line1 = lines[0].strip()
-    line2 = lines[1].strip()
-    count1 = len(line1.split())
-    count2 = len(line2.split())
-
-    x = y = z = 0
-    if count1 != count2:
-        parts = line1.split()
-        if len(parts) >= 3:
-            x, y, z = map(int, parts[:3])
-        data_lines = lines[1:]
-    else:
-        last_line = lines[-1].strip()
-        parts = last_line.split()
-        if len(parts) >= 3:
-            x, y, z = map(int, parts[:3])
-        data_lines = lines
-
-    column_number = count2 - 3
-    row_number = x * y * z
-    view.vtk_data = []
-    for line in data_lines[:row_number]:
-        parts = line.split()
-        if len(parts) < 3 + column_number:
-            continue
-        row = [float(value) for value in parts[3 : 3 + column_number]]
-        view.vtk_data.append(row)
+    x, y, z = store.dims
+    view.fieldStore = store
 
     view.tempX = x
     view.tempY = y
     view.tempZ = z
-    view.updateExtraction(x, y, z)
-    return column_number
-
-
-def update_extraction(view, x: int, y: int, z: int) -> None:
-    if view.xmaxAll < x - 1:
-        view.xmaxAll = x - 1
-    if view.ymaxAll < y - 1:
-        view.ymaxAll = y - 1
-    if view.zmaxAll < z - 1:
-        view.zmaxAll = z - 1
-    view.xminAll = 0
-    view.yminAll = 0
-    view.zminAll = 0
+    view.updateExtraction(x, y, z, store.origin)
+    return store.columns
+
+
+def load_data(
+    view,
+    file_path: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    columns: Optional[Iterable[int]] = None,
+    region: Optional[DatRegion] = None,
+) -> int:
+    return apply_field_store(view, read_field_store(file_path, progress, columns, region))
+
+
+def update_extraction(view, x: int, y: int, z: int, origin: Sequence[int] = (0, 0, 0)) -> None:
+    if view.xmaxAll < origin[0] + x - 1:
+        view.xmaxAll = origin[0] + x - 1
+    if view.ymaxAll < origin[1] + y - 1:
+        view.ymaxAll = origin[1] + y - 1
+    if view.zmaxAll < origin[2] + z - 1:
+        view.zmaxAll = origin[2] + z - 1
+    view.xminAll = origin[0]
+    view.yminAll = origin[1]
+    view.zminAll = origin[2]
     view.xmax = x - 1
     view.ymax = y - 1
     view.zmax = z - 1
@@ -85,106 +104,112 @@ def update_extraction(view, x: int, y: int, z: int) -> None:
     view.zDelta_LE.setText(str(interval))
 
 
-def output_scalar(view, path: str, column_number: int, x: int, y: int, z: int) -> None:
-    if view.data2Dx:
-        x += 2
-    else:
-        x += 1
-    if view.data2Dy:
-        y += 2
-    else:
-        y += 1
-    if view.data2Dz:
-        z += 2
-    else:
-        z += 1
-    row_number = x * y * z
-    out_path = f"{path}.{column_number+1}.vtk"
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write("# vtk DataFile Version 3.0\n")
-        f.write("Structured Points\n")
-        f.write("ASCII\n\n")
-        f.write("DATASET STRUCTURED_POINTS\n")
-        f.write(f"DIMENSIONS {x} {y} {z}\n")
-        f.write("ORIGIN 0 0 0\n")
+def vtk_spacing(view) -> tuple[str, str, str]:
+    return view.rescaleX_LE.text(), view.rescaleY_LE.text(), view.rescaleZ_LE.text()
+
+
+def _vtk_header(dims: tuple[int, int, int], spacing: tuple[str, str, str], binary: bool) -> bytes:
+    return b"".join(
+        (
+            b"# vtk DataFile Version 3.0\n",
+            b"Structured Points\n",
+            b"BINARY\n\n" if binary else b"ASCII\n\n",
+            b"DATASET STRUCTURED_POINTS\n",
+            f"DIMENSIONS {dims[0]} {dims[1]} {dims[2]}\n".encode(),
+            b"ORIGIN 0 0 0\n",
+            f"SPACING {spacing[0]} {spacing[1]} {spacing[2]}\n\n".encode(),
+            f"POINT_DATA {dims[0] * dims[1] * dims[2]}\n".encode(),
+        )
+    )
+
+
+def _float_array_bytes(values: np.ndarray, binary: bool) -> bytes:
+    if binary:
+        return np.ascontiguousarray(values, dtype=">f4").tobytes() + b"\n"
+    if values.ndim == 1:
+        return "".join(f"{value:14.6e}\n" for value in values.tolist()).encode()
+    return "".join(f"{px:14.6e} {py:14.6e} {pz:14.6e}\n" for px, py, pz in values.tolist()).encode()
+
+
+def _rgb_array_bytes(rgb: np.ndarray, binary: bool) -> bytes:
+    if binary:
+        return np.rint(rgb).astype(np.uint8).tobytes() + b"\n"
+    return "".join(f"{r:.0f} {g:.0f} {b:.0f}\n" for r, g, b in rgb.tolist()).encode()
+
+
+def scalar_volume(store: FieldStore, column_number: int, doubled: tuple[bool, bool, bool]) -> np.ndarray:
+    volume = store.volume(column_number)
+    for axis, double in enumerate(doubled):
+        if double:
+            volume = np.repeat(volume, 2, axis)
+    return volume
+
+
+def write_scalar_vtk(
+    out_path: str,
+    volume: np.ndarray,
+    spacing: tuple[str, str, str],
+    binary: bool = VTK_BINARY_OUTPUT,
+) -> None:
+    with open(out_path, "wb") as f:
         f.write(
-            f"SPACING {view.rescaleX_LE.text()} {view.rescaleY_LE.text()} {view.rescaleZ_LE.text()}\n\n"
+            b"".join(
+                (
+                    _vtk_header(volume.shape, spacing, binary),
+                    b"SCALARS scalar float\n",
+                    b"LOOKUP_TABLE default\n",
+                    _float_array_bytes(volume.transpose(2, 1, 0).ravel(), binary),
+                )
+            )
         )
-        f.write(f"POINT_DATA {row_number}\n")
-        f.write("SCALARS scalar float\n")
-        f.write("LOOKUP_TABLE default\n")
-        for m in range(z):
-            for n in range(y):
-                for w in range(x):
-                    if view.data2Dx or view.data2Dy or view.data2Dz:
-                        if view.data2Dx:
-                            value = view.vtk_data[n * z + m][column_number]
-                        elif view.data2Dy:
-                            value = view.vtk_data[w * (y - 1) * z + m][column_number]
-                        else:
-                            value = view.vtk_data[w * y * (z - 1) + n * (z - 1)][column_number]
-                    else:
-                        value = view.vtk_data[w * y * z + n * z + m][column_number]
-                    f.write(f"{value:14.6e}\n")
+
+
+def vector_arrays(vector_volume: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    vectors = np.ascontiguousarray(vector_volume.transpose(2, 1, 0, 3), dtype=np.float64).reshape(-1, 3)
+    vx = vectors[:, 0]
+    vy = vectors[:, 1]
+    vz = vectors[:, 2]
+    magnitude = np.sqrt(vx * vx + vy * vy + vz * vz)
+    magnitude_range = [0.0, float(magnitude.max()) if magnitude.size else 1.0]
+    z_range = [-magnitude_range[1], magnitude_range[1]]
+    rgb = get_rgb_array(vectors, magnitude_range, z_range, magnitude)
+    return vectors, magnitude, rgb
+
+
+def write_vector_vtk(
+    out_path: str,
+    vector_volume: np.ndarray,
+    spacing: tuple[str, str, str],
+    binary: bool = VTK_BINARY_OUTPUT,
+) -> None:
+    vectors, magnitude, rgb = vector_arrays(vector_volume)
+    with open(out_path, "wb") as f:
+        f.write(
+            b"".join(
+                (
+                    _vtk_header(vector_volume.shape[:3], spacing, binary),
+                    b"SCALARS Magnitude float \n",
+                    b"LOOKUP_TABLE default \n",
+                    _float_array_bytes(magnitude, binary),
+                    b"\n",
+                    b"VECTORS vector float\n",
+                    _float_array_bytes(vectors, binary),
+                    b"\n",
+                    b"VECTORS RGB unsigned_char\n",
+                    _rgb_array_bytes(rgb, binary),
+                )
+            )
+        )
+
+
+def output_scalar(view, path: str, column_number: int, x: int, y: int, z: int) -> None:
+    out_path = f"{path}.{column_number+1}.vtk"
+    doubled = (bool(view.data2Dx), bool(view.data2Dy), bool(view.data2Dz))
+    write_scalar_vtk(out_path, scalar_volume(view.fieldStore, column_number, doubled), vtk_spacing(view))
     view.scalarName = out_path
 
 
 def output_vector(view, path: str, col_x: int, col_y: int, col_z: int, x: int, y: int, z: int) -> None:
-    x += 1
-    y += 1
-    z += 1
-    row_number = x * y * z
     out_path = f"{path}.{col_x+1}{col_y+1}{col_z+1}.vtk"
-    magnitude = [0.0] * row_number
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write("# vtk DataFile Version 3.0\n")
-        f.write("Structured Points\n")
-        f.write("ASCII\n\n")
-        f.write("DATASET STRUCTURED_POINTS\n")
-        f.write(f"DIMENSIONS {x} {y} {z}\n")
-        f.write("ORIGIN 0 0 0\n")
-        f.write(
-            f"SPACING {view.rescaleX_LE.text()} {view.rescaleY_LE.text()} {view.rescaleZ_LE.text()}\n\n"
-        )
-        f.write(f"POINT_DATA {row_number}\n")
-        f.write("SCALARS Magnitude float \n")
-        f.write("LOOKUP_TABLE default \n")
-        for m in range(z):
-            for n in range(y):
-                for w in range(x):
-                    idx = w * y * z + n * z + m
-                    value = math.sqrt(
-                        view.vtk_data[idx][col_x] ** 2
-                        + view.vtk_data[idx][col_y] ** 2
-                        + view.vtk_data[idx][col_z] ** 2
-                    )
-                    f.write(f"{value:14.6e}\n")
-        f.write("\n")
-        f.write("VECTORS vector float\n")
-        for m in range(z):
-            for n in range(y):
-                for w in range(x):
-                    idx = w * y * z + n * z + m
-                    vx = view.vtk_data[idx][col_x]
-                    vy = view.vtk_data[idx][col_y]
-                    vz = view.vtk_data[idx][col_z]
-                    f.write(f"{vx:14.6e} {vy:14.6e} {vz:14.6e}\n")
-                    magnitude[idx] = math.sqrt(vx * vx + vy * vy + vz * vz)
-        magnitude_range = [0.0, max(magnitude) if magnitude else 1.0]
-        z_range = [-magnitude_range[1], magnitude_range[1]]
-
-        f.write("\n")
-        f.write("VECTORS RGB unsigned_char\n")
-        for m in range(z):
-            for n in range(y):
-                for w in range(x):
-                    idx = w * y * z + n * z + m
-                    rgb = get_rgb(
-                        view.vtk_data[idx][col_x],
-                        view.vtk_data[idx][col_y],
-                        view.vtk_data[idx][col_z],
-                        magnitude_range,
-                        z_range,
-                    )
-                    f.write(f"{rgb[0]:.0f} {rgb[1]:.0f} {rgb[2]:.0f}\n")
+    write_vector_vtk(out_path, view.fieldStore.vector_volume(col_x, col_y, col_z), vtk_spacing(view))
     view.vectorName = out_path
@@ -1,8 +1,15 @@
 import math
 from typing import Sequence
 
+import numpy as np
+
 from constants import PI_VALUE
 
+DOMAIN_CHUNK_ROWS = 1 << 16
+DOMAIN_TIE_TOLERANCE = 1.0e-9
+DOMAIN_CUTOFF_TOLERANCE = 1.0e-9
+FILM_TOLERANCE = 1.0e-6
+
 
 def domain_type(
     px: float,
@@ -32,6 +39,203 @@ def domain_type(
     return best_index
 
 
+def _orientation_angle(cos_value: float) -> float:
+    if cos_value > 1:
+        return 0
+    if cos_value < -1:
+        return PI_VALUE
+    return math.acos(cos_value)
+
+
+def _nearest_orientation(
+    px: float,
+    py: float,
+    pz: float,
+    length: float,
+    domain_orth: Sequence[Sequence[float]],
+) -> tuple[int, float]:
+    best_angle = math.inf
+    best_index = -1
+    best_cos = math.nan
+    for i in range(1, 27):
+        dot = px * domain_orth[i][0] + py * domain_orth[i][1] + pz * domain_orth[i][2]
+        cos_value = dot / length
+        angle = _orientation_angle(cos_value)
+        if angle < best_angle:
+            best_angle = angle
+            best_index = i
+            best_cos = cos_value
+    return best_index, best_cos
+
+
+def domain_orientation(
+    polar: np.ndarray,
+    domain_orth: Sequence[Sequence[float]],
+    chunk_rows: int = DOMAIN_CHUNK_ROWS,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    polar = np.asarray(polar, dtype=np.float64).reshape(-1, 3)
+    orth = np.asarray(domain_orth[1:27], dtype=np.float64)
+    lengths = np.empty(len(polar))
+    indices = np.full(len(polar), -1, dtype=np.int32)
+    cosines = np.full(len(polar), np.nan)
+    for start in range(0, len(polar), chunk_rows):
+        chunk = polar[start : start + chunk_rows]
+        px = np.ascontiguousarray(chunk[:, 0:1])
+        py = np.ascontiguousarray(chunk[:, 1:2])
+        pz = np.ascontiguousarray(chunk[:, 2:3])
+        length = np.sqrt(px * px + py * py + pz * pz)
+        cos_value = px * orth[:, 0]
+        cos_value += py * orth[:, 1]
+        cos_value += pz * orth[:, 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cos_value /= length
+        np.minimum(cos_value, 1.0, out=cos_value)
+        best = np.argmax(cos_value, axis=1)
+        rows = np.arange(len(chunk))
+        best_cos = cos_value[rows, best]
+        cos_value[rows, best] = -np.inf
+        runner_up = cos_value.max(axis=1)
+        length = length[:, 0]
+        valid = np.isfinite(best_cos)
+        exact = valid & (best_cos - runner_up > DOMAIN_TIE_TOLERANCE)
+        chunk_indices = np.where(exact, best + 1, -1).astype(np.int32)
+        chunk_cosines = np.where(exact, best_cos, np.nan)
+        for row in np.flatnonzero(valid & ~exact):
+            px_value, py_value, pz_value = chunk[row].tolist()
+            chunk_indices[row], chunk_cosines[row] = _nearest_orientation(
+                px_value, py_value, pz_value, float(length[row]), domain_orth
+            )
+        lengths[start : start + len(chunk)] = length
+        indices[start : start + len(chunk)] = chunk_indices
+        cosines[start : start + len(chunk)] = chunk_cosines
+    return lengths, indices, cosines
+
+
+def domain_labels(
+    lengths: np.ndarray,
+    indices: np.ndarray,
+    cosines: np.ndarray,
+    domain_standard_value: float,
+    domain_standard_angle_rad: float,
+) -> np.ndarray:
+    limit = min(domain_standard_angle_rad, PI_VALUE)
+    if not limit > 0:
+        return np.full(len(indices), -1, dtype=np.int32)
+    cutoff = math.cos(limit)
+    within = cosines > cutoff
+    near = np.flatnonzero(np.abs(cosines - cutoff) <= DOMAIN_CUTOFF_TOLERANCE)
+    within[near] = [_orientation_angle(cos_value) < limit for cos_value in cosines[near].tolist()]
+    selected = (lengths > domain_standard_value) & within
+    return np.where(selected, indices, -1).astype(np.int32)
+
+
+def domain_types(
+    polar: np.ndarray,
+    domain_standard_value: float,
+    domain_standard_angle_rad: float,
+    domain_orth: Sequence[Sequence[float]],
+    chunk_rows: int = DOMAIN_CHUNK_ROWS,
+) -> np.ndarray:
+    lengths, indices, cosines = domain_orientation(polar, domain_orth, chunk_rows)
+    return domain_labels(lengths, indices, cosines, domain_standard_value, domain_standard_angle_rad)
+
+
+def film_occupancy(polar: np.ndarray) -> np.ndarray:
+    magnitude = np.abs(np.asarray(polar, dtype=np.float64))
+    return magnitude[..., 0] + magnitude[..., 1] + magnitude[..., 2] > FILM_TOLERANCE
+
+
+def film_layers(occupied: np.ndarray) -> tuple[int, int]:
+    layers = np.flatnonzero(occupied.any(axis=(0, 1)))
+    nfs = int(layers[-1]) if layers.size else 0
+    upper = layers[layers >= 1]
+    nsub = int(upper[0]) - 1 if upper.size else 0
+    return nsub, nfs
+
+
+def film_thickness(occupied: np.ndarray) -> np.ndarray:
+    depth = occupied.shape[2]
+    bottom = np.argmax(occupied, axis=2)
+    top = depth - 1 - np.argmax(occupied[:, :, ::-1], axis=2)
+    return np.where(occupied.any(axis=2), top - bottom + 1, 0).astype(np.int32)
+
+
+def cube_map_cells(directions: np.ndarray, resolution: int) -> np.ndarray:
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    magnitude = np.abs(directions)
+    axis = np.argmax(magnitude, axis=1)
+    rows = np.arange(len(directions))
+    major = magnitude[rows, axis]
+    face = 2 * axis + (directions[rows, axis] < 0)
+    u_axis = (axis + 1) % 3
+    v_axis = (axis + 2) % 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.nan_to_num(directions[rows, u_axis] / major)
+        v = np.nan_to_num(directions[rows, v_axis] / major)
+    iu = np.clip(np.floor((u + 1) * 0.5 * resolution), 0, resolution - 1).astype(np.int64)
+    iv = np.clip(np.floor((v + 1) * 0.5 * resolution), 0, resolution - 1).astype(np.int64)
+    return (face * resolution + iu) * resolution + iv
+
+
+def _cube_map_directions(resolution: int, offsets: Sequence[float]) -> np.ndarray:
+    steps = np.arange(resolution, dtype=np.float64)
+    faces = []
+    for face in range(6):
+        axis = face // 2
+        sign = -1.0 if face % 2 else 1.0
+        for du, dv in offsets:
+            u = (steps + du) / resolution * 2 - 1
+            v = (steps + dv) / resolution * 2 - 1
+            grid_u, grid_v = np.meshgrid(u, v, indexing="ij")
+            directions = np.empty(grid_u.shape + (3,))
+            directions[..., axis] = sign
+            directions[..., (axis + 1) % 3] = grid_u
+            directions[..., (axis + 2) % 3] = grid_v
+            faces.append(directions.reshape(-1, 3))
+    directions = np.stack(faces).reshape(6, len(offsets), -1, 3).transpose(1, 0, 2, 3).reshape(len(offsets), -1, 3)
+    return directions / np.linalg.norm(directions, axis=2, keepdims=True)
+
+
+def cube_map_centers(resolution: int) -> np.ndarray:
+    return _cube_map_directions(resolution, [(0.5, 0.5)])[0]
+
+
+def domain_lookup_error(resolution: int) -> float:
+    """Largest angle (rad) between a cube-map cell center and its corners.
+
+    A lookup label can differ from domain_types only when the exact nearest
+    orientation is within this angle of the threshold, or when the two nearest
+    orientations are within twice this angle of each other.
+    """
+    centers, *corners = _cube_map_directions(resolution, [(0.5, 0.5), (0, 0), (0, 1), (1, 0), (1, 1)])
+    cosines = np.stack([np.einsum("ij,ij->i", centers, corner) for corner in corners])
+    return float(np.arccos(np.clip(cosines.min(), -1.0, 1.0)))
+
+
+def domain_lookup_table(
+    domain_standard_angle_rad: float,
+    domain_orth: Sequence[Sequence[float]],
+    resolution: int,
+) -> np.ndarray:
+    lengths, indices, cosines = domain_orientation(cube_map_centers(resolution), domain_orth)
+    return domain_labels(lengths, indices, cosines, -math.inf, domain_standard_angle_rad).astype(np.int8)
+
+
+def domain_types_lookup(
+    polar: np.ndarray,
+    domain_standard_value: float,
+    table: np.ndarray,
+    resolution: int,
+) -> np.ndarray:
+    polar = np.asarray(polar, dtype=np.float64).reshape(-1, 3)
+    px = polar[:, 0]
+    py = polar[:, 1]
+    pz = polar[:, 2]
+    length = np.sqrt(px * px + py * py + pz * pz)
+    labels = table[cube_map_cells(polar, resolution)].astype(np.int32)
+    return np.where(length > domain_standard_value, labels, -1)
+
+
 def vo2_domain_type(
     u1: float,
     u2: float,
@@ -107,3 +311,46 @@ def vo2_domain_type(
     ):
         return 8
     return -1
+
+
+def vo2_domain_types(
+    u: np.ndarray,
+    n: np.ndarray,
+    m1_mod: float,
+    m2_mod: float,
+    m1_ang: float,
+    m2_ang: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    u = np.asarray(u, dtype=np.float64).reshape(-1, 4)
+    n = np.asarray(n, dtype=np.float64).reshape(-1, 4)
+    u1, u2, u3, u4 = u.T
+    n1, n2, n3, n4 = n.T
+    u_mod = np.sqrt(u1 * u1 + u2 * u2 + u3 * u3 + u4 * u4)
+    n_mod = np.sqrt(n1 * n1 + n2 * n2 + n3 * n3 + n4 * n4)
+    root2 = math.sqrt(2)
+    cos_m1 = math.cos(m1_ang)
+    cos_m2 = math.cos(m2_ang)
+    m1_active = (u_mod > m1_mod) & (n_mod > m1_mod)
+    m2_active = (u_mod > m2_mod) & (n_mod > m2_mod)
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        def m1_variant(u_value: np.ndarray, n_value: np.ndarray) -> np.ndarray:
+            return m1_active & (np.abs(u_value) / u_mod > cos_m1) & (np.abs(n_value) / n_mod > cos_m1)
+
+        def m2_variant(u_value: np.ndarray, n_value: np.ndarray) -> np.ndarray:
+            return m2_active & (np.abs(u_value) / u_mod > cos_m2) & (np.abs(n_value) / n_mod > cos_m2)
+
+        conditions = [
+            (u_mod < m1_mod) & (n_mod < m1_mod),
+            m1_variant(u1 / root2 + u3 / root2, n1 / root2 + n3 / root2),
+            m1_variant(u2 / root2 + u4 / root2, n2 / root2 + n4 / root2),
+            m1_variant(u1 / root2 - u3 / root2, n1 / root2 - n3 / root2),
+            m1_variant(u2 / root2 - u4 / root2, n2 / root2 - n4 / root2),
+            m2_variant(u1, n1),
+            m2_variant(u2, n2),
+            m2_variant(u3, n3),
+            m2_variant(u4, n4),
+        ]
+    labels = np.select(conditions, np.arange(9, dtype=np.int32), -1).astype(np.int32)
+    counts = np.bincount(labels[labels >= 0], minlength=9)
+    return labels, counts
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import vtk
+from vtk.util import numpy_support
+
+from constants import (
+    DOMAIN_SMOOTH_ITERATIONS,
+    DOMAIN_SMOOTH_RELAXATION,
+    DOMAIN_SURFACE_CACHE_BYTES,
+    DOMAIN_SURFACE_MODE,
+    DOMAIN_SURFACE_WORKERS,
+)
+from vtk_dataset_ops import dataset_identity
+
+
+def _has_cells(data: Optional[vtk.vtkDataSet]) -> bool:
+    return data is not None and data.GetNumberOfPoints() > 0 and data.GetNumberOfCells() > 0
+
+
+def smooth_surface(port: vtk.vtkAlgorithmOutput) -> vtk.vtkPolyData:
+    smooth = vtk.vtkSmoothPolyDataFilter()
+    normal = vtk.vtkPolyDataNormals()
+    smooth.SetInputConnection(port)
+    smooth.SetNumberOfIterations(DOMAIN_SMOOTH_ITERATIONS)
+    smooth.SetRelaxationFactor(DOMAIN_SMOOTH_RELAXATION)
+    smooth.FeatureEdgeSmoothingOff()
+    smooth.BoundarySmoothingOn()
+    normal.SetInputConnection(smooth.GetOutputPort())
+    normal.ComputePointNormalsOn()
+    normal.ComputeCellNormalsOn()
+    normal.Update()
+    return normal.GetOutput()
+
+
+def threshold_surface(view, image: vtk.vtkImageData, label: int) -> Optional[vtk.vtkPolyData]:
+    threshold = vtk.vtkThreshold()
+    surface = vtk.vtkDataSetSurfaceFilter()
+    threshold.SetInputData(image)
+    threshold.AllScalarsOff()
+    view._set_threshold_between(threshold, label - 0.5, label + 0.5)
+    surface.SetInputConnection(threshold.GetOutputPort())
+    surface.Update()
+    if not _has_cells(surface.GetOutput()):
+        return None
+    return smooth_surface(surface.GetOutputPort())
+
+
+def discrete_surface(image: vtk.vtkImageData, labels: Iterable[int]) -> Optional[vtk.vtkPolyData]:
+    contour = vtk.vtkDiscreteFlyingEdges3D()
+    contour.SetInputData(image)
+    contour.SetInputArrayToProcess(0, 0, 0, vtk.vtkDataObject.FIELD_ASSOCIATION_POINTS, "domain")
+    for n, label in enumerate(labels):
+        contour.SetValue(n, label)
+    contour.ComputeNormalsOff()
+    contour.ComputeGradientsOff()
+    contour.ComputeScalarsOn()
+    contour.Update()
+    if not _has_cells(contour.GetOutput()):
+        return None
+    return smooth_surface(contour.GetOutputPort())
+
+
+def label_cells(surface: vtk.vtkPolyData, labels: np.ndarray) -> vtk.vtkPolyData:
+    labels = np.ascontiguousarray(labels, dtype=np.int32)
+    label_array = numpy_support.numpy_to_vtk(labels, deep=True)
+    label_array.SetName("domain")
+    surface.GetCellData().AddArray(label_array)
+    return surface
+
+
+def _first_point_labels(surface: vtk.vtkPolyData) -> np.ndarray:
+    polys = surface.GetPolys()
+    offsets = numpy_support.vtk_to_numpy(polys.GetOffsetsArray())
+    connectivity = numpy_support.vtk_to_numpy(polys.GetConnectivityArray())
+    point_labels = numpy_support.vtk_to_numpy(surface.GetPointData().GetArray("domain"))
+    return point_labels[connectivity[offsets[:-1]]]
+
+
+def domain_surfaces(view, image: vtk.vtkImageData, count: int) -> dict[int, vtk.vtkPolyData]:
+    workers = min(DOMAIN_SURFACE_WORKERS or os.cpu_count() or 1, count)
+    if workers <= 1:
+        built = [threshold_surface(view, image, label) for label in range(count)]
+    else:
+        inputs = []
+        for _label in range(count):
+            part = vtk.vtkImageData()
+            part.ShallowCopy(image)
+            inputs.append(part)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            built = list(pool.map(lambda label: threshold_surface(view, inputs[label], label), range(count)))
+    return {label: surface for label, surface in enumerate(built) if surface is not None}
+
+
+def merged_domain_surface(view, image: vtk.vtkImageData, count: int) -> vtk.vtkPolyData:
+    if DOMAIN_SURFACE_MODE == "discrete":
+        merged = discrete_surface(image, range(count))
+        if merged is None:
+            return vtk.vtkPolyData()
+        return label_cells(merged, _first_point_labels(merged))
+    surfaces = domain_surfaces(view, image, count)
+    if not surfaces:
+        return vtk.vtkPolyData()
+    append = vtk.vtkAppendPolyData()
+    for label, surface in surfaces.items():
+        append.AddInputData(label_cells(surface, np.full(surface.GetNumberOfCells(), label)))
+    append.Update()
+    return append.GetOutput()
+
+
+def _surface_bytes(surface: vtk.vtkPolyData) -> int:
+    return surface.GetActualMemorySize() * 1024
+
+
+def _cache_bytes(cache) -> int:
+    images = {id(image): image for image, _surface in cache.values() if image is not None}
+    total = sum(_surface_bytes(image) for image in images.values())
+    return total + sum(_surface_bytes(surface) for _image, surface in cache.values())
+
+
+def _is_registered(view, image: vtk.vtkImageData) -> bool:
+    if any(image is entry for datasets in view.vtkDatasets.values() for entry in datasets.values()):
+        return True
+    return any(image is entry for entry in view.vtkDatasetCache.values())
+
+
+def prune_domain_surfaces(view) -> None:
+    cache = view.domainSurfaceCache
+    stale = [key for key, (image, _surface) in cache.items() if image is not None and not _is_registered(view, image)]
+    for key in stale:
+        del cache[key]
+
+
+def domain_surface(
+    view,
+    name: str,
+    source: vtk.vtkTrivialProducer,
+    voi: Sequence[int],
+    count: int,
+) -> vtk.vtkPolyData:
+    image = source.GetOutputDataObject(0)
+    identity = dataset_identity(view, name, image)
+    key = (
+        identity,
+        tuple(voi),
+        tuple(image.GetSpacing()),
+        count,
+        DOMAIN_SURFACE_MODE,
+        DOMAIN_SMOOTH_ITERATIONS,
+        DOMAIN_SMOOTH_RELAXATION,
+    )
+    prune_domain_surfaces(view)
+    cache = view.domainSurfaceCache
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key][1]
+    extract = vtk.vtkExtractVOI()
+    extract.SetInputConnection(source.GetOutputPort())
+    extract.SetVOI(*voi)
+    extract.Update()
+    surface = merged_domain_surface(view, extract.GetOutput(), count)
+    cache[key] = (image if identity[0] == "image" else None, surface)
+    while len(cache) > 1 and _cache_bytes(cache) > DOMAIN_SURFACE_CACHE_BYTES:
+        cache.popitem(last=False)
+    return surface
+
+
+def attach_domain_surface(view, surface: vtk.vtkPolyData, count: int) -> None:
+    table = view.domainColorTable
+    table.SetNumberOfTableValues(count)
+    table.SetTableRange(0, count - 1)
+    table.Build()
+    mapper = vtk.vtkPolyDataMapper()
+    mapper.SetInputData(surface)
+    mapper.SetLookupTable(table)
+    mapper.SetScalarModeToUseCellFieldData()
+    mapper.SelectColorArray("domain")
+    mapper.SetColorModeToMapScalars()
+    mapper.UseLookupTableScalarRangeOn()
+    mapper.ScalarVisibilityOn()
+    view.actorDomain.SetMapper(mapper)
+    view.domainSurface = surface
+    view.domainLabelVisible = np.ones(count, dtype=bool)
+    view.domainLabelOpacity = np.ones(count)
+
+
+def _apply_domain_alpha(view) -> None:
+    table = view.domainColorTable
+    for label in range(min(table.GetNumberOfTableValues(), len(view.domainLabelVisible))):
+        r, g, b, _alpha = table.GetTableValue(label)
+        alpha = view.domainLabelOpacity[label] if view.domainLabelVisible[label] else 0.0
+        table.SetTableValue(label, r, g, b, alpha)
+    table.Modified()
+
+
+def set_domain_colors(view, colors: Sequence[Sequence[float]], opacities: Sequence[float]) -> None:
+    table = view.domainColorTable
+    for label in range(table.GetNumberOfTableValues()):
+        r, g, b = colors[label]
+        table.SetTableValue(label, r, g, b, opacities[label])
+    view.domainLabelOpacity[:] = opacities[: len(view.domainLabelOpacity)]
+    _apply_domain_alpha(view)
+
+
+def set_domain_visibility(view, visible: Sequence[bool]) -> None:
+    view.domainLabelVisible[:] = visible
+    _apply_domain_alpha(view)
+
+
+def set_domain_label_visible(view, label: int, visible: bool) -> None:
+    if 0 <= label < len(view.domainLabelVisible):
+        shown = view.domainLabelVisible.copy()
+        shown[label] = visible
+        set_domain_visibility(view, shown)
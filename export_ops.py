@@ -1,6 +1,10 @@
 from PyQt5 import QtGui, QtWidgets
 import vtk
 
+from background_ops import run_in_background
+from data_io_ops import vtk_spacing
+from vtk_dataset_ops import export_datasets, export_sources
+
 
 def save_image(view) -> None:
     file_path, _ = QtWidgets.QFileDialog.getSaveFileName(view, "Save file", "", "Images (*.png)")
@@ -27,6 +31,20 @@ def save_scene(view) -> None:
         exporter.Write()
 
 
+def save_vtk_datasets(view) -> None:
+    directory = QtWidgets.QFileDialog.getExistingDirectory(view, "Export VTK files", "")
+    if not directory:
+        return
+    sources = export_sources(view)
+    spacing = vtk_spacing(view)
+    run_in_background(
+        view,
+        "Export VTK files",
+        lambda report: export_datasets(sources, directory, spacing, report),
+        lambda _written: None,
+    )
+
+
 def output_image(view, load: str) -> None:
     render_window = view.qvtkWidget.GetRenderWindow()
     render_window.Render()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class FieldStore:
+    def __init__(
+        self,
+        data: np.ndarray,
+        dims: Sequence[int],
+        names: Optional[Sequence[str]] = None,
+        origin: Sequence[int] = (0, 0, 0),
+        source: Optional[dict] = None,
+    ) -> None:
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2:
+            data = data.reshape(len(data), -1)
+        self.data = data
+        self.dims = (int(dims[0]), int(dims[1]), int(dims[2]))
+        if names is None:
+            names = [str(i + 1) for i in range(data.shape[1])]
+        self.names = list(names)
+        self.origin = (int(origin[0]), int(origin[1]), int(origin[2]))
+        self.source = source
+
+    @classmethod
+    def empty(cls) -> "FieldStore":
+        return cls(np.empty((0, 0)), (0, 0, 0))
+
+    @property
+    def nx(self) -> int:
+        return self.dims[0]
+
+    @property
+    def ny(self) -> int:
+        return self.dims[1]
+
+    @property
+    def nz(self) -> int:
+        return self.dims[2]
+
+    @property
+    def rows(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def columns(self) -> int:
+        return self.data.shape[1]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, index: int) -> np.ndarray:
+        return self.data[:, index]
+
+    def volume(self, index: int) -> np.ndarray:
+        return self.data[:, index].reshape(self.dims)
+
+    def vectors(self, col_x: int, col_y: int, col_z: int) -> np.ndarray:
+        if col_y == col_x + 1 and col_z == col_x + 2:
+            return self.data[:, col_x : col_x + 3]
+        return np.stack((self.data[:, col_x], self.data[:, col_y], self.data[:, col_z]), axis=1)
+
+    def vector_volume(self, col_x: int, col_y: int, col_z: int) -> np.ndarray:
+        return self.vectors(col_x, col_y, col_z).reshape(self.dims + (3,))
@@ -1,11 +1,158 @@
-import math
+from typing import Callable, Optional, Sequence
 
+import numpy as np
+import vtk
 from PyQt5 import QtCore, QtWidgets
 
+from background_ops import ProgressCallback, run_in_background
 from constants import PI_VALUE
+from dat_reader import strip_compression_suffix
+from data_io_ops import (
+    apply_field_store,
+    read_field_store,
+    vtk_spacing,
+)
 from domain_criteria import DomainCriteria
+from field_store import FieldStore
 from stats_utils import get_avg, get_max, get_min
 from vo2_criteria import VO2Criteria
+from conversion_pool import ConversionJob, convert_arrays, convert_jobs, scalar_job, vector_job
+from vtk_cache import cached_image, vtk_cache
+from vtk_dataset_ops import (
+    DatasetKey,
+    DatasetPrefetch,
+    ExportProgress,
+    cache_dataset,
+    clear_datasets,
+    converted_image,
+    register_dataset_builder,
+    register_dataset_prefetch,
+)
+
+
+def _output_base(file_path: str) -> QtCore.QFileInfo:
+    file_info = QtCore.QFileInfo(strip_compression_suffix(file_path))
+    return QtCore.QFileInfo(file_info.absolutePath() + "/" + file_info.completeBaseName())
+
+
+ConversionPlan = dict[DatasetKey, tuple[ConversionJob, dict, str]]
+LoadResult = tuple[Optional[FieldStore], ConversionPlan, dict[DatasetKey, vtk.vtkImageData], object]
+
+
+def _planned_image(
+    store: FieldStore,
+    entry: tuple[ConversionJob, dict, str],
+    spacing: tuple[str, str, str],
+) -> vtk.vtkImageData:
+    job, recipe, scalar_name = entry
+    return cached_image(
+        store.source,
+        recipe,
+        lambda: converted_image(convert_arrays(store.data, store.dims, job), spacing, scalar_name, store.origin),
+    )
+
+
+def _plan_prefetch(store: FieldStore, plan: ConversionPlan, spacing: tuple[str, str, str]) -> DatasetPrefetch:
+    def prefetch(
+        keys: Sequence[DatasetKey], progress: Optional[ExportProgress] = None
+    ) -> dict[DatasetKey, vtk.vtkImageData]:
+        images = {}
+        pending = []
+        for key in keys:
+            if key not in plan:
+                continue
+            image = vtk_cache.lookup(store.source, plan[key][1])
+            if image is None:
+                pending.append(key)
+            else:
+                images[key] = image
+        converted = convert_jobs(
+            store.data,
+            store.dims,
+            [plan[key][0] for key in pending],
+            progress=None if progress is None else lambda done, total: progress(done, total, "Converting data..."),
+        )
+        for key, arrays in zip(pending, converted):
+            _job, recipe, scalar_name = plan[key]
+            images[key] = converted_image(arrays, spacing, scalar_name, store.origin)
+            vtk_cache.store(store.source, recipe, images[key])
+        return images
+
+    return prefetch
+
+
+def _load_job(
+    file_path: str,
+    planner: Optional[Callable[[FieldStore], ConversionPlan]] = None,
+    spacing: tuple[str, str, str] = ("1", "1", "1"),
+    labeler: Optional[Callable[[FieldStore, ProgressCallback], object]] = None,
+) -> Callable[[ProgressCallback], LoadResult]:
+    def job(report: ProgressCallback) -> LoadResult:
+        store = read_field_store(file_path, lambda done, total: report(done, total, "Reading data..."))
+        plan = {}
+        prebuilt = {}
+        labeled = None
+        if store is not None and planner is not None:
+            plan = planner(store)
+            for key, entry in list(plan.items())[:1]:
+                report(0, 1, "Converting data...")
+                prebuilt[key] = _planned_image(store, entry, spacing)
+                report(1, 1, "Converting data...")
+        if store is not None and labeler is not None:
+            labeled = labeler(store, report)
+            report(1, 1, "Classifying domains...")
+        return store, plan, prebuilt, labeled
+
+    return job
+
+
+def _apply_load_result(view, kind: str, result: LoadResult) -> int:
+    store, plan, prebuilt, _labeled = result
+    clear_datasets(view, kind)
+    if store is not None and plan:
+        spacing = vtk_spacing(view)
+        datasets: dict[str, list[Optional[str]]] = {}
+        for name, array_name in plan:
+            datasets.setdefault(name, []).append(array_name)
+        for name, array_names in datasets.items():
+
+            def build(array_name: Optional[str], name: str = name) -> vtk.vtkImageData:
+                return _planned_image(store, plan[(name, array_name)], spacing)
+
+            register_dataset_builder(view, kind, name, build, array_names)
+        register_dataset_prefetch(view, kind, _plan_prefetch(store, plan, spacing))
+    for (name, array_name), image in prebuilt.items():
+        cache_dataset(view, name, array_name, image)
+    return apply_field_store(view, store)
+
+
+def _scalar_plan(base: str) -> Callable[[FieldStore], ConversionPlan]:
+    def plan(store: FieldStore) -> ConversionPlan:
+        doubled = tuple(size == 1 for size in store.dims)
+        return {
+            (f"{base}.scalar.vtk", name): (
+                scalar_job(i, doubled),
+                {"kind": "scalar", "array": name, "doubled": doubled},
+                name,
+            )
+            for i, name in enumerate(store.names)
+        }
+
+    return plan
+
+
+def _vector_plan(base: str) -> Callable[[FieldStore], ConversionPlan]:
+    def plan(store: FieldStore) -> ConversionPlan:
+        return {
+            (f"{base}.{3*i+1}{3*i+2}{3*i+3}.vtk", None): (
+                vector_job(3 * i, 3 * i + 1, 3 * i + 2),
+                {"kind": "vector", "columns": [3 * i, 3 * i + 1, 3 * i + 2]},
+                "Magnitude",
+            )
+            for i in range(store.columns // 3)
+        }
+
+    return plan
 
 
 def slot_open_file_scalar(view) -> None:
@@ -14,44 +161,13 @@ def slot_open_file_scalar(view) -> None:
         return
     suffix = QtCore.QFileInfo(file_path).suffix().lower()
     if suffix != "vtk":
-        view.columns = view.loadData(file_path)
-        view.inputTab.setCurrentIndex(0)
-        view.data2Dx = view.tempX == 1
-        view.data2Dy = view.tempY == 1
-        view.data2Dz = view.tempZ == 1
-
-        view.scalar_CB.setCheckState(QtCore.Qt.Checked)
-        view.volume_CB.setCheckState(QtCore.Qt.Checked)
-        view.vector_CB.setCheckState(QtCore.Qt.Unchecked)
-        view.domain_CB.setCheckState(QtCore.Qt.Unchecked)
-
-        file_info = QtCore.QFileInfo(file_path)
-        view.scalarDir = QtCore.QFileInfo(file_info.absolutePath() + "/" + file_info.completeBaseName())
-
-        view.scalarChoice.clear()
-        for i in range(view.columns):
-            view.outputScalar(view.scalarDir.absoluteFilePath(), i, view.xmax, view.ymax, view.zmax)
-            view.scalarChoice.addItem(str(i + 1))
-
-        view.inputFileScalar.setText(file_info.fileName())
-        view.rowcolScalar.setText(str(view.columns))
-        view.xMinMaxScalar.setText(f"1 - {view.xmax + 1}")
-        view.yMinMaxScalar.setText(f"1 - {view.ymax + 1}")
-        view.zMinMaxScalar.setText(f"1 - {view.zmax + 1}")
-
-        view.scalar_Table.clearContents()
-        while view.scalar_Table.rowCount() > 0:
-            view.scalar_Table.removeRow(0)
-        for i in range(view.columns):
-            col_values = [row[i] for row in view.vtk_data]
-            view.scalar_Table.insertRow(view.scalar_Table.rowCount())
-            view.scalar_Table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(get_min(col_values))))
-            view.scalar_Table.setItem(i, 1, QtWidgets.QTableWidgetItem(str(get_max(col_values))))
-            view.scalar_Table.setItem(i, 2, QtWidgets.QTableWidgetItem(str(get_avg(col_values))))
-
-        view.scalarName = f"{view.scalarDir.absoluteFilePath()}.{view.scalarChoice.currentIndex()+1}.vtk"
-        view.updateVTK(view.scalarName, view.vectorName)
-        view.vtk_data = []
+        base = _output_base(file_path).absoluteFilePath()
+        run_in_background(
+            view,
+            "Open scalar data",
+            _load_job(file_path, _scalar_plan(base), vtk_spacing(view)),
+            lambda result: _finish_open_scalar(view, file_path, result),
+        )
     else:
         view.columns = 1
         view.scalarChoice.clear()
@@ -70,12 +186,49 @@ def slot_open_file_scalar(view) -> None:
         view.updateVTK(view.scalarName, view.vectorName)
 
 
+def _finish_open_scalar(view, file_path: str, result: LoadResult) -> None:
+    view.columns = _apply_load_result(view, "scalar", result)
+    view.inputTab.setCurrentIndex(0)
+    view.data2Dx = view.tempX == 1
+    view.data2Dy = view.tempY == 1
+    view.data2Dz = view.tempZ == 1
+
+    view.scalar_CB.setCheckState(QtCore.Qt.Checked)
+    view.volume_CB.setCheckState(QtCore.Qt.Checked)
+    view.vector_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.domain_CB.setCheckState(QtCore.Qt.Unchecked)
+
+    file_info = QtCore.QFileInfo(file_path)
+    view.scalarDir = _output_base(file_path)
+
+    view.scalarName = f"{view.scalarDir.absoluteFilePath()}.scalar.vtk"
+    view.scalarChoice.clear()
+    for i in range(view.columns):
+        view.scalarChoice.addItem(view.fieldStore.names[i])
+
+    view.inputFileScalar.setText(file_info.fileName())
+    view.rowcolScalar.setText(str(view.columns))
+    view.xMinMaxScalar.setText(f"1 - {view.xmax + 1}")
+    view.yMinMaxScalar.setText(f"1 - {view.ymax + 1}")
+    view.zMinMaxScalar.setText(f"1 - {view.zmax + 1}")
+
+    view.scalar_Table.clearContents()
+    while view.scalar_Table.rowCount() > 0:
+        view.scalar_Table.removeRow(0)
+    for i in range(view.columns):
+        col_values = view.fieldStore.column(i)
+        view.scalar_Table.insertRow(view.scalar_Table.rowCount())
+        view.scalar_Table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(get_min(col_values))))
+        view.scalar_Table.setItem(i, 1, QtWidgets.QTableWidgetItem(str(get_max(col_values))))
+        view.scalar_Table.setItem(i, 2, QtWidgets.QTableWidgetItem(str(get_avg(col_values))))
+
+    view.updateVTK(view.scalarName, view.vectorName)
+    view.fieldStore = FieldStore.empty()
+
+
 def on_scalar_choice_current_index_changed(view, _index: int) -> None:
     if view.scalarChoice.count() <= 0:
         return
-    base = view.scalarDir.absoluteFilePath()
-    if base:
-        view.scalarName = f"{base}.{view.scalarChoice.currentIndex()+1}.vtk"
     view.updateFlag = False
     if view.stackedWidget.currentIndex() == 0 and view.scalar_CB.isChecked():
         view.slotUpdate()
@@ -87,56 +240,13 @@ def slot_open_file_vector(view) -> None:
         return
     suffix = QtCore.QFileInfo(file_path).suffix().lower()
     if suffix != "vtk":
-        view.columns = view.loadData(file_path)
-        view.inputTab.setCurrentIndex(1)
-        file_info = QtCore.QFileInfo(file_path)
-        view.vectorDir = QtCore.QFileInfo(file_info.absolutePath() + "/" + file_info.completeBaseName())
-
-        view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
-        view.volume_CB.setCheckState(QtCore.Qt.Unchecked)
-        view.vector_CB.setCheckState(QtCore.Qt.Checked)
-        view.vectorGlyph_CB.setCheckState(QtCore.Qt.Checked)
-        view.domain_CB.setCheckState(QtCore.Qt.Unchecked)
-
-        view.vectorChoice.clear()
-        for i in range(view.columns // 3):
-            view.outputVector(
-                view.vectorDir.absoluteFilePath(), 3 * i, 3 * i + 1, 3 * i + 2, view.xmax, view.ymax, view.zmax
-            )
-            view.vectorChoice.addItem(f"{3*i+1}{3*i+2}{3*i+3}")
-
-        view.inputFileVector.setText(file_info.fileName())
-        view.rowcolVector.setText(str(view.columns))
-        view.xMinMaxVector.setText(f"1 - {view.xmax + 1}")
-        view.yMinMaxVector.setText(f"1 - {view.ymax + 1}")
-        view.zMinMaxVector.setText(f"1 - {view.zmax + 1}")
-
-        view.vector_Table.clearContents()
-        while view.vector_Table.rowCount() > 0:
-            view.vector_Table.removeRow(0)
-        for i in range(view.columns):
-            col_values = [row[i] for row in view.vtk_data]
-            view.vector_Table.insertRow(view.vector_Table.rowCount())
-            view.vector_Table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(get_min(col_values))))
-            view.vector_Table.setItem(i, 1, QtWidgets.QTableWidgetItem(str(get_max(col_values))))
-            view.vector_Table.setItem(i, 2, QtWidgets.QTableWidgetItem(str(get_avg(col_values))))
-
-        magnitudes = [
-            math.sqrt(row[0] * row[0] + row[1] * row[1] + row[2] * row[2])
-            for row in view.vtk_data
-        ]
-        if magnitudes:
-            view.vectorValueMin_LE.setText(str(min(magnitudes)))
-            view.vectorValueMax_LE.setText(str(max(magnitudes)))
-            if max(magnitudes) != 0:
-                view.vectorScale_LE.setText(str(5 / max(magnitudes)))
-
-        index = view.vectorChoice.currentIndex()
-        view.vectorName = (
-            f"{view.vectorDir.absoluteFilePath()}.{3*index+1}{3*index+2}{3*index+3}.vtk"
+        base = _output_base(file_path).absoluteFilePath()
+        run_in_background(
+            view,
+            "Open vector data",
+            _load_job(file_path, _vector_plan(base), vtk_spacing(view)),
+            lambda result: _finish_open_vector(view, file_path, result),
         )
-        view.updateVTK(view.scalarName, view.vectorName)
-        view.vtk_data = []
     else:
         view.columns = 3
         view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
@@ -154,23 +264,91 @@ def slot_open_file_vector(view) -> None:
         view.updateVTK(view.scalarName, view.vectorName)
 
 
-def on_vector_choice_current_index_changed(view, index) -> None:
-    if view.vectorChoice.count() <= 0:
+def _finish_open_vector(view, file_path: str, result: LoadResult) -> None:
+    view.columns = _apply_load_result(view, "vector", result)
+    view.inputTab.setCurrentIndex(1)
+    file_info = QtCore.QFileInfo(file_path)
+    view.vectorDir = _output_base(file_path)
+
+    view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.volume_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.vector_CB.setCheckState(QtCore.Qt.Checked)
+    view.vectorGlyph_CB.setCheckState(QtCore.Qt.Checked)
+    view.domain_CB.setCheckState(QtCore.Qt.Unchecked)
+
+    view.vectorChoice.clear()
+    for i in range(view.columns // 3):
+        view.vectorChoice.addItem(f"{3*i+1}{3*i+2}{3*i+3}")
+
+    view.inputFileVector.setText(file_info.fileName())
+    view.rowcolVector.setText(str(view.columns))
+    view.xMinMaxVector.setText(f"1 - {view.xmax + 1}")
+    view.yMinMaxVector.setText(f"1 - {view.ymax + 1}")
+    view.zMinMaxVector.setText(f"1 - {view.zmax + 1}")
+
+    view.vector_Table.clearContents()
+    while view.vector_Table.rowCount() > 0:
+        view.vector_Table.removeRow(0)
+    for i in range(view.columns):
+        col_values = view.fieldStore.column(i)
+        view.vector_Table.insertRow(view.vector_Table.rowCount())
+        view.vector_Table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(get_min(col_values))))
+        view.vector_Table.setItem(i, 1, QtWidgets.QTableWidgetItem(str(get_max(col_values))))
+        view.vector_Table.setItem(i, 2, QtWidgets.QTableWidgetItem(str(get_avg(col_values))))
+
+    if view.columns >= 3:
+        magnitudes = np.sqrt(np.sum(view.fieldStore.vectors(0, 1, 2) ** 2, axis=1))
+    else:
+        magnitudes = np.empty(0)
+    if magnitudes.size:
+        max_magnitude = float(magnitudes.max())
+        view.vectorValueMin_LE.setText(str(float(magnitudes.min())))
+        view.vectorValueMax_LE.setText(str(max_magnitude))
+        if max_magnitude != 0:
+            view.vectorScale_LE.setText(str(5 / max_magnitude))
+
+    index = view.vectorChoice.currentIndex()
+    view.vectorName = (
+        f"{view.vectorDir.absoluteFilePath()}.{3*index+1}{3*index+2}{3*index+3}.vtk"
+    )
+    view.updateVTK(view.scalarName, view.vectorName)
+    view.fieldStore = FieldStore.empty()
+
+
+def on_vector_choice_current_index_changed(view, index: int) -> None:
+    if view.vectorChoice.count() <= 0 or index < 0:
         return
-    try:
-        index_value = int(index)
-    except (TypeError, ValueError):
-        index_value = view.vectorChoice.currentIndex()
     base = view.vectorDir.absoluteFilePath()
     if base:
-        view.vectorName = (
-            f"{base}.{3*index_value+1}{3*index_value+2}{3*index_value+3}.vtk"
-        )
+        view.vectorName = f"{base}.{3*index+1}{3*index+2}{3*index+3}.vtk"
     view.updateFlag = False
     if view.stackedWidget.currentIndex() == 0 and view.vector_CB.isChecked():
         view.slotUpdate()
 
 
+def _domain_labeler(view) -> Callable[[FieldStore, ProgressCallback], tuple[vtk.vtkImageData, dict]]:
+    spacing = vtk_spacing(view)
+    cache = view.domainLabelCache()
+
+    def label(store: FieldStore, report: ProgressCallback) -> tuple[vtk.vtkImageData, dict]:
+        x, y, z = (size - 1 for size in store.dims)
+        return view.buildDomainImage(store, x, y, z, spacing, cache, report), cache
+
+    return label
+
+
+def _vo2_domain_labeler(
+    view,
+) -> Callable[[FieldStore, ProgressCallback], tuple[vtk.vtkImageData, Optional[np.ndarray]]]:
+    spacing = vtk_spacing(view)
+
+    def label(store: FieldStore, report: ProgressCallback) -> tuple[vtk.vtkImageData, Optional[np.ndarray]]:
+        x, y, z = (size - 1 for size in store.dims)
+        return view.buildVO2DomainImage(store, x, y, z, spacing, report)
+
+    return label
+
+
 def slot_open_file_domain(view) -> None:
     file_path, _ = QtWidgets.QFileDialog.getOpenFileName(view, "Input", "", "Input (*.*)")
     if not file_path:
@@ -184,36 +362,12 @@ def slot_open_file_domain(view) -> None:
             view.domainStandardValue = domain_dialog.getDomainStdValue()
             view.domainStdAngle_LE.setText(str(view.domainStandardAngle))
             view.domainStdValue_LE.setText(str(view.domainStandardValue))
-
-            view.columns = view.loadData(file_path)
-            view.inputTab.setCurrentIndex(2)
-            view.existDomain = [False] * 27
-            file_info = QtCore.QFileInfo(file_path)
-            view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
-            view.volume_CB.setCheckState(QtCore.Qt.Unchecked)
-            view.vector_CB.setCheckState(QtCore.Qt.Unchecked)
-            view.domain_CB.setCheckState(QtCore.Qt.Checked)
-            view.domainDir = QtCore.QFileInfo(file_info.absolutePath() + "/" + file_info.completeBaseName())
-
-            view.outputDomain(view.domainDir.absoluteFilePath(), view.xmax, view.ymax, view.zmax)
-            view.inputFileDomain.setText(file_info.fileName())
-            view.rowcolDomain.setText(str(view.columns))
-            view.xMinMaxDomain.setText(f"1 - {view.xmax + 1}")
-            view.yMinMaxDomain.setText(f"1 - {view.ymax + 1}")
-            view.zMinMaxDomain.setText(f"1 - {view.zmax + 1}")
-
-            view.domain_Table.clearContents()
-            while view.domain_Table.rowCount() > 0:
-                view.domain_Table.removeRow(0)
-            for i in range(view.columns):
-                col_values = [row[i] for row in view.vtk_data]
-                view.domain_Table.insertRow(view.domain_Table.rowCount())
-                view.domain_Table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(get_min(col_values))))
-                view.domain_Table.setItem(i, 1, QtWidgets.QTableWidgetItem(str(get_max(col_values))))
-                view.domain_Table.setItem(i, 2, QtWidgets.QTableWidgetItem(str(get_avg(col_values))))
-
-            view.domainName = f"{view.domainDir.absoluteFilePath()}.domain.vtk"
-            view.drawDomain(view.domainName)
+            run_in_background(
+                view,
+                "Open domain data",
+                _load_job(file_path, labeler=_domain_labeler(view)),
+                lambda result: _finish_open_domain(view, file_path, result),
+            )
     elif switch_control == 1:
         vo2_dialog = VO2Criteria(view)
         if vo2_dialog.exec() == QtWidgets.QDialog.Accepted:
@@ -225,16 +379,60 @@ def slot_open_file_domain(view) -> None:
             view.vo2_M1_ang_LE.setText(str(view.M1ang * 180.0 / PI_VALUE))
             view.vo2_M2_mod_LE.setText(str(view.M2mod))
             view.vo2_M2_ang_LE.setText(str(view.M2ang * 180.0 / PI_VALUE))
-            view.columns = view.loadData(file_path)
-            view.inputTab.setCurrentIndex(2)
-            view.existDomain = [False] * 27
-            file_info = QtCore.QFileInfo(file_path)
-            view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
-            view.volume_CB.setCheckState(QtCore.Qt.Unchecked)
-            view.vector_CB.setCheckState(QtCore.Qt.Unchecked)
-            view.domain_CB.setCheckState(QtCore.Qt.Checked)
-            view.domainDir = QtCore.QFileInfo(file_info.absolutePath() + "/" + file_info.completeBaseName())
-
-            view.outputVO2Domain(view.domainDir.absoluteFilePath(), view.xmax, view.ymax, view.zmax)
-            view.domainName = f"{view.domainDir.absoluteFilePath()}.domain.vtk"
-            view.drawVO2Domain(view.domainName)
+            run_in_background(
+                view,
+                "Open VO2 domain data",
+                _load_job(file_path, labeler=_vo2_domain_labeler(view)),
+                lambda result: _finish_open_vo2_domain(view, file_path, result),
+            )
+
+
+def _finish_open_domain(view, file_path: str, result: LoadResult) -> None:
+    view.columns = _apply_load_result(view, "domain", result)
+    view.inputTab.setCurrentIndex(2)
+    view.existDomain = [False] * 27
+    file_info = QtCore.QFileInfo(file_path)
+    view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.volume_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.vector_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.domain_CB.setCheckState(QtCore.Qt.Checked)
+    view.domainDir = _output_base(file_path)
+
+    if result[3] is not None:
+        image, cache = result[3]
+        view.setDomainLabelCache(cache)
+        view.showDomainImage(view.domainDir.absoluteFilePath(), image)
+    view.inputFileDomain.setText(file_info.fileName())
+    view.rowcolDomain.setText(str(view.columns))
+    view.xMinMaxDomain.setText(f"1 - {view.xmax + 1}")
+    view.yMinMaxDomain.setText(f"1 - {view.ymax + 1}")
+    view.zMinMaxDomain.setText(f"1 - {view.zmax + 1}")
+
+    view.domain_Table.clearContents()
+    while view.domain_Table.rowCount() > 0:
+        view.domain_Table.removeRow(0)
+    for i in range(view.columns):
+        col_values = view.fieldStore.column(i)
+        view.domain_Table.insertRow(view.domain_Table.rowCount())
+        view.domain_Table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(get_min(col_values))))
+        view.domain_Table.setItem(i, 1, QtWidgets.QTableWidgetItem(str(get_max(col_values))))
+        view.domain_Table.setItem(i, 2, QtWidgets.QTableWidgetItem(str(get_avg(col_values))))
+
+    view.domainName = f"{view.domainDir.absoluteFilePath()}.domain.vtk"
+    view.drawDomain(view.domainName)
+
+
+def _finish_open_vo2_domain(view, file_path: str, result: LoadResult) -> None:
+    view.columns = _apply_load_result(view, "domain", result)
+    view.inputTab.setCurrentIndex(2)
+    view.existDomain = [False] * 27
+    view.scalar_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.volume_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.vector_CB.setCheckState(QtCore.Qt.Unchecked)
+    view.domain_CB.setCheckState(QtCore.Qt.Checked)
+    view.domainDir = _output_base(file_path)
+
+    if result[3] is not None:
+        view.showVO2DomainImage(view.domainDir.absoluteFilePath(), *result[3])
+    view.domainName = f"{view.domainDir.absoluteFilePath()}.domain.vtk"
+    view.drawVO2Domain(view.domainName)
@@ -3,8 +3,10 @@ from __future__ import annotations
 import math
 import os
 import sys
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
 
+import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets, uic
 try:
     from PyQt5 import QtUiTools
@@ -12,27 +14,51 @@ except ImportError:
     QtUiTools = None
 
 import vtk
+from vtk.util import numpy_support
 
 from plot_widget import QCustomPlot, QCPPlotTitle
 from column1d import Column1D
+from background_ops import ProgressCallback
 from batch3d import Batch3D
-from color_utils import get_rgb
+from dat_reader import DatRegion
 from data_io_ops import (
     load_data as data_load_data,
     output_scalar as data_output_scalar,
     output_vector as data_output_vector,
     update_extraction as data_update_extraction,
+    vtk_spacing as data_vtk_spacing,
+)
+from domain_calculation import (
+    domain_labels,
+    domain_lookup_table,
+    domain_orientation,
+    domain_types_lookup,
+    film_layers,
+    film_occupancy,
+    film_thickness,
+    vo2_domain_types,
 )
-from domain_calculation import domain_type, vo2_domain_type
 from constants import (
     DOMAIN_ORTH,
     DEFAULT_DOMAIN_COLORS,
     DEFAULT_DOMAIN_LIST,
     DEFAULT_VO2_COLORS,
     DEFAULT_VO2_DOMAIN_LIST,
+    DOMAIN_LOOKUP_CLASSIFY,
+    DOMAIN_LOOKUP_RESOLUTION,
+    DOMAIN_STANDARD_ANGLE,
+    DOMAIN_STANDARD_VALUE,
     PI_VALUE,
 )
+from domain_surface_ops import (
+    attach_domain_surface,
+    domain_surface,
+    set_domain_colors,
+    set_domain_label_visible,
+    set_domain_visibility,
+)
 from domain_workflow import domain_processing
+from field_store import FieldStore
 from point_probe_ops import (
     clear_point_probe_vector_dataset as pp_clear_point_probe_vector_dataset,
     current_point_probe_mode as pp_current_point_probe_mode,
@@ -57,6 +83,8 @@ from vtk_interaction_ops import (
     on_vtk_mouse_move_lock_pan as vtk_on_vtk_mouse_move_lock_pan,
 )
 from coordinate_ruler_ops import update_coordinate_ruler as coord_update_coordinate_ruler
+from vtk_dataset_ops import DATASET_KINDS, dataset_source, domain_image, has_dataset, register_dataset
+from vtk_cache import cached_image
 from vtk_pipeline_ops import update_vtk as pipeline_update_vtk
 from export_ops import (
     apply_png_dpi as export_apply_png_dpi,
@@ -65,6 +93,7 @@ from export_ops import (
     output_image as export_output_image,
     save_image as export_save_image,
     save_scene as export_save_scene,
+    save_vtk_datasets as export_save_vtk_datasets,
 )
 from file_open_ops import (
     on_scalar_choice_current_index_changed as open_on_scalar_choice_current_index_changed,
@@ -173,7 +202,16 @@ class SimpleView(QtWidgets.QMainWindow):
         self.existDomain: List[bool] = [False] * 27
         self.pointFraction: List[float] = [0.0] * 27
 
-        self.vtk_data: List[List[float]] = []
+        self.fieldStore = FieldStore.empty()
+        self.domainFilm: Optional[tuple] = None
+        self.domainFilmThickness: Optional[np.ndarray] = None
+        self.domainOrientation: Optional[tuple] = None
+        self.domainLookup: Optional[tuple] = None
+        self.vtkDatasets: dict[str, dict[str, vtk.vtkImageData]] = {kind: {} for kind in DATASET_KINDS}
+        self.vtkDatasetBuilders: dict[str, dict[str, tuple]] = {kind: {} for kind in DATASET_KINDS}
+        self.vtkDatasetPrefetch: dict[str, Callable] = {}
+        self.vtkDatasetCache: OrderedDict[tuple[str, Optional[str]], vtk.vtkImageData] = OrderedDict()
+        self.backgroundRunner = None
         self.updateFlag = False
 
         self.camera = vtk.vtkCamera()
@@ -192,7 +230,12 @@ class SimpleView(QtWidgets.QMainWindow):
         self.actorScalar = vtk.vtkVolume()
         self.coordRulerActor = vtk.vtkCubeAxesActor()
 
-        self.actorDomain = [vtk.vtkActor() for _ in range(27)]
+        self.actorDomain = vtk.vtkActor()
+        self.domainColorTable = vtk.vtkLookupTable()
+        self.domainSurface: Optional[vtk.vtkPolyData] = None
+        self.domainSurfaceCache: OrderedDict[tuple, tuple] = OrderedDict()
+        self.domainLabelVisible = np.ones(27, dtype=bool)
+        self.domainLabelOpacity = np.ones(27)
         self.actorIso: List[vtk.vtkActor] = []
 
         self.widget = vtk.vtkOrientationMarkerWidget()
@@ -212,7 +255,7 @@ class SimpleView(QtWidgets.QMainWindow):
         self._pointProbePicker = vtk.vtkCellPicker()
         self._pointProbeWorldPicker = vtk.vtkWorldPointPicker()
         self._pointProbePicker.SetTolerance(0.0005)
-        self._pointProbeScalarReader: Optional[vtk.vtkStructuredPointsReader] = None
+        self._pointProbeScalarReader: Optional[vtk.vtkTrivialProducer] = None
         self._pointProbeScalarExtractor: Optional[vtk.vtkExtractVOI] = None
         self._pointProbeScalarOutput: Optional[vtk.vtkImageData] = None
         self._pointProbeScalarColumn: Optional[int] = None
@@ -227,7 +270,7 @@ class SimpleView(QtWidgets.QMainWindow):
         self._middlePanViewDirection: Optional[tuple[float, float, float]] = None
         self._middlePanViewUp: Optional[tuple[float, float, float]] = None
 
-        self.readerVectorOrigin = vtk.vtkStructuredPointsReader()
+        self.readerVectorOrigin = vtk.vtkTrivialProducer()
 
         self.reset = True
         self.data2Dx = False
@@ -248,9 +291,9 @@ class SimpleView(QtWidgets.QMainWindow):
         self.zmaxAll = 0
         self.outlineWidth = 1
 
-        self.domainStandardValue = 0.3
-        self.domainStandardAngle = 180.0
-        self.domainStandardAngleRad = 180.0 * PI_VALUE / 180.0
+        self.domainStandardValue = DOMAIN_STANDARD_VALUE
+        self.domainStandardAngle = DOMAIN_STANDARD_ANGLE
+        self.domainStandardAngleRad = DOMAIN_STANDARD_ANGLE * PI_VALUE / 180.0
         self.M1mod = 0.1
         self.M2mod = 0.1
         self.M1ang = 10.0 * PI_VALUE / 180.0
@@ -412,6 +455,7 @@ class SimpleView(QtWidgets.QMainWindow):
         self.actionClear.triggered.connect(self.slotClear)
         self.actionSave.triggered.connect(self.saveImage)
         self.actionExportX3D.triggered.connect(self.saveScene)
+        self.actionExportVTK.triggered.connect(self.saveVTKDatasets)
         self.actionRotateToXP.triggered.connect(self.slotUpdateCamera1)
         self.actionRotateToXN.triggered.connect(self.slotUpdateCamera2)
         self.actionRotateToYP.triggered.connect(self.slotUpdateCamera3)
@@ -423,6 +467,8 @@ class SimpleView(QtWidgets.QMainWindow):
         self.actionOutputStatus.triggered.connect(self.slotOutputStatus)
         self.actionLoadStatus.triggered.connect(self.slotLoadStatus)
         self.actionBatch3D.triggered.connect(self.slotBatch3D)
+        self.scalarChoice.currentIndexChanged[int].connect(self.slotScalarChoice)
+        self.vectorChoice.currentIndexChanged[int].connect(self.slotVectorChoice)
 
         if hasattr(self.file1_Widget, "figureReplot"):
             self.file1_Widget.figureReplot.connect(self.figurePlot)
@@ -876,23 +922,25 @@ class SimpleView(QtWidgets.QMainWindow):
     def slotOpenFile_scalar(self) -> None:
         open_slot_open_file_scalar(self)
 
-    def on_scalarChoice_currentIndexChanged(self, _index: int) -> None:
-        open_on_scalar_choice_current_index_changed(self, _index)
+    def slotScalarChoice(self, index: int) -> None:
+        open_on_scalar_choice_current_index_changed(self, index)
 
     def slotOpenFile_vector(self) -> None:
         open_slot_open_file_vector(self)
 
-    def on_vectorChoice_currentIndexChanged(self, index) -> None:
+    def slotVectorChoice(self, index: int) -> None:
         open_on_vector_choice_current_index_changed(self, index)
 
     def slotOpenFile_domain(self) -> None:
         open_slot_open_file_domain(self)
 
-    def loadData(self, file_path: str) -> int:
-        return data_load_data(self, file_path)
+    def loadData(
+        self, file_path: str, columns: Optional[List[int]] = None, region: Optional[DatRegion] = None
+    ) -> int:
+        return data_load_data(self, file_path, columns=columns, region=region)
 
-    def updateExtraction(self, x: int, y: int, z: int) -> None:
-        data_update_extraction(self, x, y, z)
+    def updateExtraction(self, x: int, y: int, z: int, origin: Sequence[int] = (0, 0, 0)) -> None:
+        data_update_extraction(self, x, y, z, origin)
 
     def outputScalar(self, path: str, column_number: int, x: int, y: int, z: int) -> None:
         data_output_scalar(self, path, column_number, x, y, z)
@@ -1259,7 +1307,8 @@ class SimpleView(QtWidgets.QMainWindow):
             return
 
     def on_domainRePlot_PB_released(self) -> None:
-        if not self.domainDir.exists():
+        domainname = f"{self.domainDir.absoluteFilePath()}.domain.vtk"
+        if self.fieldStore.rows == 0 or not has_dataset(self, domainname):
             return
         if self.domain_Combo.currentIndex() == 0:
             self.domainStandardAngle = float(self.domainStdAngle_LE.text() or self.domainStandardAngle)
@@ -1383,8 +1432,7 @@ class SimpleView(QtWidgets.QMainWindow):
     def on_domain_CB_stateChanged(self, state: int) -> None:
         self.domain_TW.setEnabled(bool(state))
         self.outlineDomainActor.SetVisibility(bool(state))
-        for i in range(27):
-            self.actorDomain[i].SetVisibility(bool(state))
+        self.actorDomain.SetVisibility(bool(state))
         self.qvtkWidget.GetRenderWindow().Render()
 
     def on_domain_TW_itemChanged(self, item: QtWidgets.QTableWidgetItem) -> None:
@@ -1410,15 +1458,11 @@ class SimpleView(QtWidgets.QMainWindow):
                     QtCore.Qt.Checked if item.checkState() else QtCore.Qt.Unchecked
                 )
         else:
-            idx = row - 4
-            if 0 <= idx < len(self.actorDomain):
-                self.actorDomain[idx].SetVisibility(item.checkState() == QtCore.Qt.Checked)
+            set_domain_label_visible(self, row - 4, item.checkState() == QtCore.Qt.Checked)
         self.qvtkWidget.GetRenderWindow().Render()
 
     def on_vo2Domain_LW_itemChanged(self, item: QtWidgets.QListWidgetItem) -> None:
-        idx = self.vo2Domain_LW.row(item)
-        if 0 <= idx < len(self.actorDomain):
-            self.actorDomain[idx].SetVisibility(item.checkState() == QtCore.Qt.Checked)
+        set_domain_label_visible(self, self.vo2Domain_LW.row(item), item.checkState() == QtCore.Qt.Checked)
         self.qvtkWidget.GetRenderWindow().Render()
 
     def on_isosurface_CB_stateChanged(self, state: int) -> None:
@@ -1520,7 +1564,7 @@ class SimpleView(QtWidgets.QMainWindow):
         self.reset = False
 
     def drawDomain(self, domainname: str) -> None:
-        if not domainname or not os.path.isfile(domainname):
+        if not has_dataset(self, domainname):
             return
         if not self.domain_CB.isChecked():
             return
@@ -1552,82 +1596,49 @@ class SimpleView(QtWidgets.QMainWindow):
                         int(self.domainRGB[index][2] * 255),
                     )
                 )
-        readerDomainOrigin = vtk.vtkStructuredPointsReader()
-        readerDomainOrigin.SetFileName(domainname)
-        readerDomainOrigin.Update()
-        readerDomainOrigin.GetOutput().SetSpacing(
-            float(self.rescaleX_LE.text() or 1),
-            float(self.rescaleY_LE.text() or 1),
-            float(self.rescaleZ_LE.text() or 1),
-        )
-        readerDomainOrigin.GetOutput().GetPointData().SetActiveScalars("domain")
-        readerDomainOrigin.GetOutput().GetPointData().SetActiveScalars("domain")
-
-        readerDomain = vtk.vtkExtractVOI()
-        readerDomain.SetInputConnection(readerDomainOrigin.GetOutputPort())
-        readerDomain.SetVOI(0, self.xmax + 2, 0, self.ymax + 2, 0, self.zmax + 2)
-        readerDomain.Update()
+        readerDomainOrigin = dataset_source(self, domainname, data_vtk_spacing(self))
+        if readerDomainOrigin is None:
+            return
+        readerDomainOrigin.GetOutputDataObject(0).GetPointData().SetActiveScalars("domain")
 
         if self.qvtkWidget.GetRenderWindow().GetRenderers().GetNumberOfItems() == 0:
             self.qvtkWidget.GetRenderWindow().AddRenderer(vtk.vtkRenderer())
         domainRenderer = self.qvtkWidget.GetRenderWindow().GetRenderers().GetFirstRenderer()
 
-        for i in range(27):
-            threshold = vtk.vtkThreshold()
-            surface = vtk.vtkDataSetSurfaceFilter()
-            threshold.SetInputConnection(readerDomain.GetOutputPort())
-            threshold.AllScalarsOff()
-            self._set_threshold_between(threshold, i - 0.5, i + 0.5)
-            surface.SetInputConnection(threshold.GetOutputPort())
-            surface.Update()
-            has_data = (
-                surface.GetOutput() is not None
-                and surface.GetOutput().GetNumberOfPoints() > 0
-                and surface.GetOutput().GetNumberOfCells() > 0
-            )
-            if has_data:
-                smooth = vtk.vtkSmoothPolyDataFilter()
-                normal = vtk.vtkPolyDataNormals()
-                mapper = vtk.vtkDataSetMapper()
-                smooth.SetInputConnection(surface.GetOutputPort())
-                smooth.SetNumberOfIterations(30)
-                smooth.SetRelaxationFactor(0.1)
-                smooth.FeatureEdgeSmoothingOff()
-                smooth.BoundarySmoothingOn()
-                normal.SetInputConnection(smooth.GetOutputPort())
-                normal.ComputePointNormalsOn()
-                normal.ComputeCellNormalsOn()
-                mapper.SetInputConnection(normal.GetOutputPort())
-            else:
-                mapper = vtk.vtkDataSetMapper()
-                empty_poly = vtk.vtkPolyData()
-                mapper.SetInputData(empty_poly)
-            mapper.ScalarVisibilityOff()
-            self.actorDomain[i].SetMapper(mapper)
-            r, g, b = self.domainRGB[i]
-            self.actorDomain[i].GetProperty().SetColor(r, g, b)
-            self.actorDomain[i].GetProperty().SetOpacity(1)
-            if self.domain_TW.item(i + 4, 0).checkState() == QtCore.Qt.Checked:
-                self.actorDomain[i].SetVisibility(True)
-                domainRenderer.AddActor(self.actorDomain[i])
-
+        start = readerDomainOrigin.GetOutputDataObject(0).GetExtent()[::2]
+        voi = (
+            start[0],
+            start[0] + self.xmax + 2,
+            start[1],
+            start[1] + self.ymax + 2,
+            start[2],
+            start[2] + self.zmax + 2,
+        )
+        attach_domain_surface(self, domain_surface(self, domainname, readerDomainOrigin, voi, 27), 27)
+        opacity = [1.0] * 27
         for i in range(self.alphaDomain_Table.rowCount()):
             index = self.domainAlpha_Combo.findText(self.alphaDomain_Table.item(i, 0).text())
             value = float(self.alphaDomain_Table.item(i, 1).text())
             if index >= 4:
-                self.actorDomain[index - 4].GetProperty().SetOpacity(value)
+                opacity[index - 4] = value
             elif index == 0:
                 for j in range(27):
-                    self.actorDomain[j].GetProperty().SetOpacity(value)
+                    opacity[j] = value
             elif index == 1:
                 for j in range(1, 9):
-                    self.actorDomain[j].GetProperty().SetOpacity(value)
+                    opacity[j] = value
             elif index == 2:
                 for j in range(9, 21):
-                    self.actorDomain[j].GetProperty().SetOpacity(value)
+                    opacity[j] = value
             elif index == 3:
                 for j in range(21, 27):
-                    self.actorDomain[j].GetProperty().SetOpacity(value)
+                    opacity[j] = value
+        set_domain_colors(self, self.domainRGB, opacity)
+        set_domain_visibility(
+            self, [self.domain_TW.item(i + 4, 0).checkState() == QtCore.Qt.Checked for i in range(27)]
+        )
+        self.actorDomain.SetVisibility(True)
+        domainRenderer.AddActor(self.actorDomain)
 
         outlineDomain = vtk.vtkOutlineFilter()
         outlineDomain.SetInputConnection(readerDomainOrigin.GetOutputPort())
@@ -1639,10 +1650,7 @@ class SimpleView(QtWidgets.QMainWindow):
         domainRenderer.SetBackground(0.9, 0.9, 0.9)
         domainRenderer.AddActor(self.outlineDomainActor)
         self.outlineDomainActor.SetVisibility(self.outline_CB.checkState() != 0)
-        self._update_coordinate_ruler(
-            domainRenderer,
-            (0, self.xmax + 2, 0, self.ymax + 2, 0, self.zmax + 2),
-        )
+        self._update_coordinate_ruler(domainRenderer, voi)
 
         if self.reset:
             self.updateCamera(-1)
@@ -1651,22 +1659,13 @@ class SimpleView(QtWidgets.QMainWindow):
             self.updateCamera(0)
 
     def drawVO2Domain(self, domainname: str) -> None:
-        if not domainname or not os.path.isfile(domainname):
+        if not has_dataset(self, domainname):
             return
         if not self.domain_CB.isChecked():
             return
-        readerDomainOrigin = vtk.vtkStructuredPointsReader()
-        readerDomainOrigin.SetFileName(domainname)
-        readerDomainOrigin.Update()
-        readerDomainOrigin.GetOutput().SetSpacing(
-            float(self.rescaleX_LE.text() or 1),
-            float(self.rescaleY_LE.text() or 1),
-            float(self.rescaleZ_LE.text() or 1),
-        )
-        readerDomain = vtk.vtkExtractVOI()
-        readerDomain.SetInputConnection(readerDomainOrigin.GetOutputPort())
-        readerDomain.SetVOI(0, self.xmax + 2, 0, self.ymax + 2, 0, self.zmax + 2)
-        readerDomain.Update()
+        readerDomainOrigin = dataset_source(self, domainname, data_vtk_spacing(self))
+        if readerDomainOrigin is None:
+            return
 
         if self.qvtkWidget.GetRenderWindow().GetRenderers().GetNumberOfItems() == 0:
             self.qvtkWidget.GetRenderWindow().AddRenderer(vtk.vtkRenderer())
@@ -1700,50 +1699,28 @@ class SimpleView(QtWidgets.QMainWindow):
                         )
                     )
 
-        for i in range(9):
-            threshold = vtk.vtkThreshold()
-            surface = vtk.vtkDataSetSurfaceFilter()
-            threshold.SetInputConnection(readerDomain.GetOutputPort())
-            threshold.AllScalarsOff()
-            self._set_threshold_between(threshold, i - 0.5, i + 0.5)
-            surface.SetInputConnection(threshold.GetOutputPort())
-            surface.Update()
-            has_data = (
-                surface.GetOutput() is not None
-                and surface.GetOutput().GetNumberOfPoints() > 0
-                and surface.GetOutput().GetNumberOfCells() > 0
-            )
-            if has_data:
-                smooth = vtk.vtkSmoothPolyDataFilter()
-                normal = vtk.vtkPolyDataNormals()
-                mapper = vtk.vtkDataSetMapper()
-                smooth.SetInputConnection(surface.GetOutputPort())
-                smooth.SetNumberOfIterations(30)
-                smooth.SetRelaxationFactor(0.1)
-                smooth.FeatureEdgeSmoothingOff()
-                smooth.BoundarySmoothingOn()
-                normal.SetInputConnection(smooth.GetOutputPort())
-                normal.ComputePointNormalsOn()
-                normal.ComputeCellNormalsOn()
-                mapper.SetInputConnection(normal.GetOutputPort())
-            else:
-                mapper = vtk.vtkDataSetMapper()
-                empty_poly = vtk.vtkPolyData()
-                mapper.SetInputData(empty_poly)
-            mapper.ScalarVisibilityOff()
-            self.actorDomain[i].SetMapper(mapper)
-            r, g, b = self.vo2DomainRGB[i]
-            self.actorDomain[i].GetProperty().SetColor(r, g, b)
-            self.actorDomain[i].GetProperty().SetOpacity(1)
-            if self.vo2Domain_LW.item(i).checkState() == QtCore.Qt.Checked:
-                self.actorDomain[i].SetVisibility(True)
-                domainRenderer.AddActor(self.actorDomain[i])
-
+        start = readerDomainOrigin.GetOutputDataObject(0).GetExtent()[::2]
+        voi = (
+            start[0],
+            start[0] + self.xmax + 2,
+            start[1],
+            start[1] + self.ymax + 2,
+            start[2],
+            start[2] + self.zmax + 2,
+        )
+        attach_domain_surface(self, domain_surface(self, domainname, readerDomainOrigin, voi, 9), 9)
+        opacity = [1.0] * 9
         for i in range(self.alphaDomain_Table.rowCount()):
             index = self.vo2Opacity_Combo.findText(self.alphaDomain_Table.item(i, 0).text())
             value = float(self.alphaDomain_Table.item(i, 1).text())
-            if 0 <= index < len(self.actorDomain):
-                self.actorDomain[index].GetProperty().SetOpacity(value)
+            if 0 <= index < len(opacity):
+                opacity[index] = value
+        set_domain_colors(self, self.vo2DomainRGB, opacity)
+        set_domain_visibility(
+            self, [self.vo2Domain_LW.item(i).checkState() == QtCore.Qt.Checked for i in range(9)]
+        )
+        self.actorDomain.SetVisibility(True)
+        domainRenderer.AddActor(self.actorDomain)
 
         outlineDomain = vtk.vtkOutlineFilter()
         outlineDomain.SetInputConnection(readerDomainOrigin.GetOutputPort())
@@ -1755,10 +1732,7 @@ class SimpleView(QtWidgets.QMainWindow):
         domainRenderer.SetBackground(0.9, 0.9, 0.9)
         domainRenderer.AddActor(self.outlineDomainActor)
         self.outlineDomainActor.SetVisibility(self.outline_CB.checkState() != 0)
-        self._update_coordinate_ruler(
-            domainRenderer,
-            (0, self.xmax + 2, 0, self.ymax + 2, 0, self.zmax + 2),
-        )
+        self._update_coordinate_ruler(domainRenderer, voi)
 
         if self.reset:
             self.updateCamera(-1)
@@ -1767,93 +1741,73 @@ class SimpleView(QtWidgets.QMainWindow):
             self.updateCamera(0)
 
     def outputDomain(self, filedir: str, x: int, y: int, z: int) -> None:
-        row_number = (x + 3) * (y + 3) * (z + 3)
-        output_data = [-1] * row_number
-        mR = mO = mT = mN = 0
-        point_number = [0] * 27
-
+        cache = self.domainLabelCache()
+        image = self.buildDomainImage(self.fieldStore, x, y, z, data_vtk_spacing(self), cache)
+        self.setDomainLabelCache(cache)
+        self.showDomainImage(filedir, image)
+
+    def domainLabelCache(self) -> dict[str, object]:
+        return {
+            "film": self.domainFilm,
+            "thickness": self.domainFilmThickness,
+            "orientation": self.domainOrientation,
+            "lookup": self.domainLookup,
+        }
+
+    def setDomainLabelCache(self, cache: dict[str, object]) -> None:
+        self.domainFilm = cache["film"]
+        self.domainFilmThickness = cache["thickness"]
+        self.domainOrientation = cache["orientation"]
+        self.domainLookup = cache["lookup"]
+
+    def buildDomainImage(
+        self,
+        store: FieldStore,
+        x: int,
+        y: int,
+        z: int,
+        spacing: tuple[str, str, str],
+        cache: dict[str, object],
+        report: Optional[ProgressCallback] = None,
+    ) -> vtk.vtkImageData:
         index = 0
-        if self.columns == 6:
+        if store.columns == 6:
             index = 3
 
-        nfs = 0
-        nsub = 0
-        for i in range(z + 1):
-            for j in range(y + 1):
-                for k in range(x + 1):
-                    row = k * (z + 1) * (y + 1) + j * (z + 1) + i
-                    px, py, pz = self.vtk_data[row][index : index + 3]
-                    if abs(px) + abs(py) + abs(pz) > 1.0e-6:
-                        nfs = i
-                        break
-        for i in range(z, 0, -1):
-            for j in range(y + 1):
-                for k in range(x + 1):
-                    row = k * (z + 1) * (y + 1) + j * (z + 1) + i
-                    px, py, pz = self.vtk_data[row][index : index + 3]
-                    if abs(px) + abs(py) + abs(pz) > 1.0e-6:
-                        nsub = i - 1
-                        break
-
-        for i in range(1, x + 2):
-            for j in range(1, y + 2):
-                for k in range(1, nsub + 1):
-                    hold = k * (x + 3) * (y + 3) + j * (x + 3) + i
-                    output_data[hold] = 0
-
-        for i in range(1, x + 2):
-            for j in range(1, y + 2):
-                for k in range(nsub + 1, nfs + 2):
-                    row = (i - 1) * (z + 1) * (y + 1) + (j - 1) * (z + 1) + (k - 1)
-                    px, py, pz = self.vtk_data[row][index : index + 3]
-                    hold = k * (x + 3) * (y + 3) + j * (x + 3) + i
-                    output_data[hold] = domain_type(
-                        px,
-                        py,
-                        pz,
-                        self.domainStandardValue,
-                        self.domainStandardAngleRad,
-                        self.domainOrth,
-                    )
-                    if 1 <= output_data[hold] < 9:
-                        mR += 1
-                    if 9 <= output_data[hold] < 21:
-                        mO += 1
-                    if 21 <= output_data[hold] < 27:
-                        mT += 1
-                    if output_data[hold] == -1:
-                        mN += 1
-                    else:
-                        point_number[output_data[hold]] += 1
-
-        mfilm = mR + mO + mT
-        if mfilm > 0:
-            for i in range(1, 27):
-                self.pointFraction[i] = point_number[i] / float(mfilm)
-        else:
-            for i in range(1, 27):
-                self.pointFraction[i] = 0.0
-
-        out_path = f"{filedir}.domain.vtk"
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("# vtk DataFile Version 3.0\n")
-            f.write("Structured Points\n")
-            f.write("ASCII\n\n")
-            f.write("DATASET STRUCTURED_POINTS\n")
-            f.write(f"DIMENSIONS {x+3} {y+3} {z+3}\n")
-            f.write("ORIGIN -1 -1 -1\n")
-            f.write(
-                f"SPACING {self.rescaleX_LE.text()} {self.rescaleY_LE.text()} {self.rescaleZ_LE.text()}\n\n"
-            )
-            f.write(f"POINT_DATA {row_number}\n")
-            f.write("SCALARS domain int\n")
-            f.write("LOOKUP_TABLE default\n")
-            for value in output_data:
-                f.write(f"{value}\n")
+        def build() -> vtk.vtkImageData:
+            output_data = np.full((z + 3, y + 3, x + 3), -1, dtype=np.int32)
+            nsub, nfs, labels = self._domain_film_labels(store, index, x, y, z, cache, report)
+            output_data[1 : nsub + 1, 1 : y + 2, 1 : x + 2] = 0
+            film = output_data[nsub + 1 : nfs + 2, 1 : y + 2, 1 : x + 2]
+            film[...] = labels.reshape(film.shape)
+            return domain_image(output_data.ravel(), (x + 3, y + 3, z + 3), spacing, store.origin)
 
-        for i in range(row_number):
-            if output_data[i] != -1:
-                self.existDomain[output_data[i]] = True
+        if (
+            self.domainStandardValue != DOMAIN_STANDARD_VALUE
+            or self.domainStandardAngleRad != DOMAIN_STANDARD_ANGLE * PI_VALUE / 180.0
+        ):
+            return build()
+        recipe = {
+            "kind": "domain",
+            "column": index,
+            "extent": [x, y, z],
+            "value": float(self.domainStandardValue),
+            "angle": float(self.domainStandardAngleRad),
+            "orth": [[float(value) for value in vec] for vec in self.domainOrth],
+        }
+        if DOMAIN_LOOKUP_CLASSIFY:
+            recipe["lookup"] = DOMAIN_LOOKUP_RESOLUTION
+        return cached_image(store.source, recipe, build)
+
+    def showDomainImage(self, filedir: str, image: vtk.vtkImageData) -> None:
+        register_dataset(self, "domain", f"{filedir}.domain.vtk", image)
+
+        point_number = self._domain_point_number(image, 27)
+        mfilm = int(point_number[1:27].sum())
+        for i in range(1, 27):
+            self.pointFraction[i] = int(point_number[i]) / float(mfilm) if mfilm > 0 else 0.0
+        for i in np.flatnonzero(point_number):
+            self.existDomain[i] = True
 
         total_fraction = sum(self.pointFraction[1:27])
         r_fraction = sum(self.pointFraction[1:9])
@@ -1879,62 +1833,119 @@ class SimpleView(QtWidgets.QMainWindow):
                     QtCore.Qt.Checked if self.existDomain[i] else QtCore.Qt.Unchecked
                 )
 
+    def _domain_film(
+        self, store: FieldStore, index: int, x: int, y: int, z: int, cache: dict[str, object]
+    ) -> tuple[tuple, int, int, np.ndarray]:
+        key = (store, index, x, y, z)
+        if cache["film"] is not None and cache["film"][0] == key:
+            return cache["film"]
+        polar = store.vector_volume(index, index + 1, index + 2)
+        occupied = film_occupancy(polar[: x + 1, : y + 1, : z + 1])
+        nsub, nfs = film_layers(occupied)
+        cache["thickness"] = film_thickness(occupied)
+        film = polar[: x + 1, : y + 1, nsub : nfs + 1].transpose(2, 1, 0, 3)
+        cache["film"] = (key, nsub, nfs, film)
+        return cache["film"]
+
+    def _domain_film_labels(
+        self,
+        store: FieldStore,
+        index: int,
+        x: int,
+        y: int,
+        z: int,
+        cache: dict[str, object],
+        report: Optional[ProgressCallback] = None,
+    ) -> tuple[int, int, np.ndarray]:
+        if report is not None:
+            report(0, 3, "Extracting film...")
+        film_key, nsub, nfs, film = self._domain_film(store, index, x, y, z, cache)
+        if report is not None:
+            report(1, 3, "Computing domain orientations...")
+        orth = tuple(tuple(float(v) for v in vec) for vec in self.domainOrth)
+        if DOMAIN_LOOKUP_CLASSIFY:
+            key = (self.domainStandardAngleRad, orth, DOMAIN_LOOKUP_RESOLUTION)
+            if cache["lookup"] is None or cache["lookup"][0] != key:
+                table = domain_lookup_table(self.domainStandardAngleRad, self.domainOrth, DOMAIN_LOOKUP_RESOLUTION)
+                cache["lookup"] = (key, table)
+            if report is not None:
+                report(2, 3, "Labeling domains...")
+            labels = domain_types_lookup(
+                film, self.domainStandardValue, cache["lookup"][1], DOMAIN_LOOKUP_RESOLUTION
+            )
+            return nsub, nfs, labels
+        key = (film_key, orth)
+        if cache["orientation"] is None or cache["orientation"][0] != key:
+            cache["orientation"] = (key, domain_orientation(film, self.domainOrth))
+        if report is not None:
+            report(2, 3, "Labeling domains...")
+        lengths, indices, cosines = cache["orientation"][1]
+        labels = domain_labels(
+            lengths,
+            indices,
+            cosines,
+            self.domainStandardValue,
+            self.domainStandardAngleRad,
+        )
+        return nsub, nfs, labels
+
+    def _domain_point_number(self, image: vtk.vtkImageData, count: int) -> np.ndarray:
+        labels = numpy_support.vtk_to_numpy(image.GetPointData().GetScalars())
+        return np.bincount(labels[labels >= 0], minlength=count)
+
     def outputVO2Domain(self, filedir: str, x: int, y: int, z: int) -> None:
-        row_number = (x + 3) * (y + 3) * (z + 3)
-        output_data = [-1] * row_number
-        point_number = [0] * 9
-        mfilm = 0
-
-        for i in range(1, x + 2):
-            for j in range(1, y + 2):
-                for k in range(1, z + 2):
-                    row = (i - 1) * (z + 1) * (y + 1) + (j - 1) * (z + 1) + (k - 1)
-                    values = self.vtk_data[row]
-                    u1, u2, u3, u4 = values[0:4]
-                    n1, n2, n3, n4 = values[4:8]
-                    hold = k * (x + 3) * (y + 3) + j * (x + 3) + i
-                    output_data[hold] = vo2_domain_type(
-                        u1,
-                        u2,
-                        u3,
-                        u4,
-                        n1,
-                        n2,
-                        n3,
-                        n4,
-                        self.M1mod,
-                        self.M2mod,
-                        self.M1ang,
-                        self.M2ang,
-                    )
-                    if output_data[hold] != -1:
-                        point_number[output_data[hold]] += 1
-                        if 1 <= output_data[hold] <= 8:
-                            mfilm += 1
+        image, point_number = self.buildVO2DomainImage(self.fieldStore, x, y, z, data_vtk_spacing(self))
+        self.showVO2DomainImage(filedir, image, point_number)
 
-        for i in range(1, 9):
-            self.pointFraction[i] = point_number[i] / float(mfilm) if mfilm else 0.0
-
-        out_path = f"{filedir}.domain.vtk"
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("# vtk DataFile Version 3.0\n")
-            f.write("Structured Points\n")
-            f.write("ASCII\n\n")
-            f.write("DATASET STRUCTURED_POINTS\n")
-            f.write(f"DIMENSIONS {x+3} {y+3} {z+3}\n")
-            f.write("ORIGIN -1 -1 -1\n")
-            f.write(
-                f"SPACING {self.rescaleX_LE.text()} {self.rescaleY_LE.text()} {self.rescaleZ_LE.text()}\n\n"
+    def buildVO2DomainImage(
+        self,
+        store: FieldStore,
+        x: int,
+        y: int,
+        z: int,
+        spacing: tuple[str, str, str],
+        report: Optional[ProgressCallback] = None,
+    ) -> tuple[vtk.vtkImageData, Optional[np.ndarray]]:
+        point_number = None
+
+        def build() -> vtk.vtkImageData:
+            nonlocal point_number
+            if report is not None:
+                report(0, 2, "Extracting order parameters...")
+            output_data = np.full((z + 3, y + 3, x + 3), -1, dtype=np.int32)
+            values = store.data.reshape(store.dims + (store.columns,))[: x + 1, : y + 1, : z + 1, :8]
+            values = values.transpose(2, 1, 0, 3).reshape(-1, 8)
+            if report is not None:
+                report(1, 2, "Classifying domains...")
+            labels, point_number = vo2_domain_types(
+                values[:, 0:4],
+                values[:, 4:8],
+                self.M1mod,
+                self.M2mod,
+                self.M1ang,
+                self.M2ang,
             )
-            f.write(f"POINT_DATA {row_number}\n")
-            f.write("SCALARS domain int\n")
-            f.write("LOOKUP_TABLE default\n")
-            for value in output_data:
-                f.write(f"{value}\n")
-
-        for i in range(row_number):
-            if output_data[i] != -1:
-                self.existDomain[output_data[i]] = True
+            output_data[1 : z + 2, 1 : y + 2, 1 : x + 2] = labels.reshape(z + 1, y + 1, x + 1)
+            return domain_image(output_data.ravel(), (x + 3, y + 3, z + 3), spacing, store.origin)
+
+        recipe = {
+            "kind": "vo2",
+            "extent": [x, y, z],
+            "criteria": [float(self.M1mod), float(self.M2mod), float(self.M1ang), float(self.M2ang)],
+        }
+        image = cached_image(store.source, recipe, build)
+        return image, point_number
+
+    def showVO2DomainImage(self, filedir: str, image: vtk.vtkImageData, point_number: Optional[np.ndarray]) -> None:
+        register_dataset(self, "domain", f"{filedir}.domain.vtk", image)
+
+        if point_number is None:
+            point_number = self._domain_point_number(image, 9)
+        mfilm = int(point_number[1:9].sum())
+        for i in range(1, 9):
+            self.pointFraction[i] = int(point_number[i]) / float(mfilm) if mfilm else 0.0
+        for i in np.flatnonzero(point_number):
+            self.existDomain[i] = True
 
         for i in range(9):
             item = self.vo2Domain_LW.item(i)
@@ -1948,6 +1959,9 @@ class SimpleView(QtWidgets.QMainWindow):
     def saveScene(self) -> None:
         export_save_scene(self)
 
+    def saveVTKDatasets(self) -> None:
+        export_save_vtk_datasets(self)
+
     def _safe_positive_int(self, text: str, default: int) -> int:
         try:
             value = int(float(text))
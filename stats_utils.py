@@ -1,13 +1,15 @@
 from typing import Sequence
 
+import numpy as np
+
 
 def get_min(values: Sequence[float]) -> float:
-    return min(values) if values else 0.0
+    return float(np.min(values)) if len(values) else 0.0
 
 
 def get_max(values: Sequence[float]) -> float:
-    return max(values) if values else 0.0
+    return float(np.max(values)) if len(values) else 0.0
 
 
 def get_avg(values: Sequence[float]) -> float:
-    return sum(values) / float(len(values)) if values else 0.0
+    return float(np.mean(values)) if len(values) else 0.0
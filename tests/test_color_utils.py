@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from color_utils import get_rgb, get_rgb_array
+
+
+def _vectors() -> np.ndarray:
+    rng = np.random.default_rng(13)
+    random = rng.normal(scale=0.5, size=(20000, 3))
+    out_of_plane = np.zeros((500, 3))
+    out_of_plane[:, 2] = rng.normal(size=500)
+    near_axis = rng.normal(scale=1.0e-7, size=(500, 3))
+    near_axis[:, 2] = rng.normal(size=500)
+    axes = np.array([[1.0, 0.0, 0.0], [-1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, -1.0, 0.0], [1.0, -0.0, 0.5]])
+    return np.concatenate([random, out_of_plane, near_axis, axes, np.zeros((10, 3))])
+
+
+@pytest.mark.parametrize("magnitude_range", [(0.0, 1.0), (0.2, 0.8), (0.5, 0.5)])
+@pytest.mark.parametrize("z_range", [(-1.0, 1.0), (0.0, 0.0)])
+def test_get_rgb_array_matches_per_point(magnitude_range: tuple, z_range: tuple) -> None:
+    vectors = _vectors()
+    expected = np.array([get_rgb(px, py, pz, magnitude_range, z_range) for px, py, pz in vectors.tolist()])
+    np.testing.assert_allclose(get_rgb_array(vectors, magnitude_range, z_range), expected, rtol=0, atol=1.0e-9)
+
+
+def test_get_rgb_array_accepts_precomputed_magnitude() -> None:
+    vectors = _vectors()
+    magnitude = np.linalg.norm(vectors, axis=1)
+    np.testing.assert_allclose(
+        get_rgb_array(vectors, (0.0, 1.0), (-1.0, 1.0), magnitude),
+        get_rgb_array(vectors, (0.0, 1.0), (-1.0, 1.0)),
+        rtol=0,
+        atol=1.0e-9,
+    )
@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+import pytest
+
+from constants import DOMAIN_ORTH, PI_VALUE
+from domain_calculation import domain_type, domain_types
+
+
+def _polarization(angle_rad: float) -> np.ndarray:
+    rng = np.random.default_rng(17)
+    orth = np.asarray(DOMAIN_ORTH[1:27], dtype=np.float64)
+    random = rng.normal(scale=0.5, size=(20000, 3))
+    lattice = rng.integers(-2, 3, size=(5000, 3)).astype(np.float64)
+    ties = (orth[rng.integers(0, 26, 2000)] + orth[rng.integers(0, 26, 2000)]) * rng.uniform(0.1, 2.0, (2000, 1))
+    axis = orth[rng.integers(0, 26, 2000)]
+    side = np.cross(axis, rng.normal(size=(2000, 3)))
+    side /= np.linalg.norm(side, axis=1, keepdims=True)
+    cutoff = axis * math.cos(angle_rad) + side * math.sin(angle_rad)
+    return np.concatenate([random, lattice, ties, cutoff, np.zeros((10, 3))])
+
+
+@pytest.mark.parametrize("angle_deg", [0.0, 10.0, 20.0, 35.26438968, 45.0, 90.0, 180.0, 200.0])
+@pytest.mark.parametrize("value", [0.0, 0.3])
+def test_domain_types_matches_per_voxel_loop(angle_deg: float, value: float) -> None:
+    angle_rad = angle_deg * PI_VALUE / 180.0
+    polar = _polarization(angle_rad)
+    expected = [domain_type(px, py, pz, value, angle_rad, DOMAIN_ORTH) for px, py, pz in polar.tolist()]
+    assert domain_types(polar, value, angle_rad, DOMAIN_ORTH, chunk_rows=4096).tolist() == expected
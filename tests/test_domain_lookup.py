@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pytest
+
+from constants import DOMAIN_ORTH, PI_VALUE
+from domain_calculation import domain_lookup_error, domain_lookup_table, domain_types, domain_types_lookup
+
+
+def _nearest_angles(polar: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    orth = np.asarray(DOMAIN_ORTH[1:27], dtype=np.float64)
+    cosines = polar @ orth.T / np.linalg.norm(polar, axis=1, keepdims=True)
+    angles = np.sort(np.arccos(np.clip(cosines, -1.0, 1.0)), axis=1)
+    return angles[:, 0], angles[:, 1]
+
+
+@pytest.mark.parametrize("resolution", [64, 256])
+@pytest.mark.parametrize("angle_deg", [10.0, 20.0, 45.0, 180.0])
+def test_lookup_matches_exact_within_bound(resolution: int, angle_deg: float) -> None:
+    rng = np.random.default_rng(resolution + int(angle_deg))
+    polar = rng.normal(size=(200000, 3))
+    angle_rad = angle_deg * PI_VALUE / 180.0
+    exact = domain_types(polar, 0.0, angle_rad, DOMAIN_ORTH)
+    table = domain_lookup_table(angle_rad, DOMAIN_ORTH, resolution)
+    lookup = domain_types_lookup(polar, 0.0, table, resolution)
+    bound = domain_lookup_error(resolution)
+    best, runner_up = _nearest_angles(polar[exact != lookup])
+    near_threshold = np.abs(best - angle_rad) <= bound
+    near_tie = runner_up - best <= 2 * bound
+    assert np.all(near_threshold | near_tie)
+    assert np.mean(exact != lookup) < 0.05
+
+
+def test_lookup_error_shrinks_with_resolution() -> None:
+    assert domain_lookup_error(256) < domain_lookup_error(128) < domain_lookup_error(64)
+    assert domain_lookup_error(256) < math.radians(0.5)
+
+
+def test_lookup_respects_magnitude_threshold() -> None:
+    polar = np.array([[0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [2.0, 0.0, 0.0]])
+    table = domain_lookup_table(PI_VALUE, DOMAIN_ORTH, 64)
+    assert domain_types_lookup(polar, 0.5, table, 64).tolist() == [-1, -1, 21]
@@ -1,4 +1,4 @@
-import os
+from vtk_dataset_ops import has_dataset
 
 
 def on_axis_cb_state_changed(view, state: int) -> None:
@@ -15,9 +15,9 @@ def on_coord_ruler_cb_state_changed(view, state: int) -> None:
         enabled
         and view.stackedWidget.currentIndex() == 0
         and (
-            (view.scalarName and os.path.isfile(view.scalarName))
-            or (view.vectorName and os.path.isfile(view.vectorName))
-            or (view.domainName and os.path.isfile(view.domainName))
+            has_dataset(view, view.scalarName)
+            or has_dataset(view, view.vectorName)
+            or has_dataset(view, view.domainName)
         )
     ):
         view.slotUpdate()
@@ -300,9 +300,9 @@ def refresh_after_extraction_edit(view) -> None:
     if view.stackedWidget.currentIndex() != 0 or not view.extract_CB.isChecked():
         return
     has_visual_data = (
-        (view.scalar_CB.isChecked() and view.scalarName and os.path.isfile(view.scalarName))
-        or (view.vector_CB.isChecked() and view.vectorName and os.path.isfile(view.vectorName))
-        or (view.domain_CB.isChecked() and view.domainName and os.path.isfile(view.domainName))
+        (view.scalar_CB.isChecked() and has_dataset(view, view.scalarName))
+        or (view.vector_CB.isChecked() and has_dataset(view, view.vectorName))
+        or (view.domain_CB.isChecked() and has_dataset(view, view.domainName))
     )
     if has_visual_data:
         view.slotUpdate()
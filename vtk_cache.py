@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import vtk
+from vtk.util import numpy_support
+
+from constants import VTK_CACHE_DIR, VTK_CACHE_MAX_BYTES
+from data_cache import DiskCache
+
+ATTRIBUTE_SETTERS = {"scalars": "SetScalars", "vectors": "SetVectors"}
+
+
+def _array_attribute(point_data: vtk.vtkPointData, array: vtk.vtkDataArray) -> Optional[str]:
+    if point_data.GetScalars() is array:
+        return "scalars"
+    if point_data.GetVectors() is array:
+        return "vectors"
+    return None
+
+
+class VtkCache(DiskCache):
+    def __init__(self, root: str = VTK_CACHE_DIR, max_bytes: int = VTK_CACHE_MAX_BYTES) -> None:
+        super().__init__(root, max_bytes)
+
+    @staticmethod
+    def key_for(source: dict, recipe: dict) -> str:
+        text = json.dumps({"source": source, "recipe": recipe}, sort_keys=True)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[vtk.vtkImageData]:
+        meta = self.read_meta(key)
+        if meta is None:
+            return None
+        image = vtk.vtkImageData()
+        if "extent" in meta:
+            image.SetExtent(*meta["extent"])
+        else:
+            image.SetDimensions(*meta["dims"])
+        image.SetOrigin(*meta["origin"])
+        point_data = image.GetPointData()
+        try:
+            for index, entry in enumerate(meta["arrays"]):
+                values = np.load(self.path(key, f".{index}.npy"), mmap_mode="r")
+                array = numpy_support.numpy_to_vtk(values, deep=False)
+                array.SetName(entry["name"])
+                setter = ATTRIBUTE_SETTERS.get(entry["attribute"])
+                if setter is None:
+                    point_data.AddArray(array)
+                else:
+                    getattr(point_data, setter)(array)
+        except (OSError, ValueError, KeyError):
+            self.discard(key)
+            return None
+        self.touch(key)
+        return image
+
+    def save(self, key: str, image: vtk.vtkImageData, meta: dict) -> None:
+        point_data = image.GetPointData()
+        arrays = []
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            for index in range(point_data.GetNumberOfArrays()):
+                array = point_data.GetArray(index)
+                np.save(self.path(key, f".{index}.npy"), numpy_support.vtk_to_numpy(array))
+                arrays.append({"name": array.GetName(), "attribute": _array_attribute(point_data, array)})
+            self.write_meta(
+                key,
+                dict(
+                    meta,
+                    dims=list(image.GetDimensions()),
+                    extent=list(image.GetExtent()),
+                    origin=list(image.GetOrigin()),
+                    arrays=arrays,
+                    created=time.time(),
+                ),
+            )
+        except OSError:
+            self.discard(key)
+            return
+        self.evict(keep=key)
+
+    def lookup(self, source: Optional[dict], recipe: dict) -> Optional[vtk.vtkImageData]:
+        if source is None or self.max_bytes <= 0:
+            return None
+        return self.load(self.key_for(source, recipe))
+
+    def store(self, source: Optional[dict], recipe: dict, image: vtk.vtkImageData) -> None:
+        if source is None or self.max_bytes <= 0:
+            return
+        self.save(self.key_for(source, recipe), image, {"source": source, "recipe": recipe})
+
+    def image(
+        self,
+        source: Optional[dict],
+        recipe: dict,
+        build: Callable[[], vtk.vtkImageData],
+    ) -> vtk.vtkImageData:
+        image = self.lookup(source, recipe)
+        if image is None:
+            image = build()
+            self.store(source, recipe, image)
+        return image
+
+
+vtk_cache = VtkCache()
+
+
+def cached_image(
+    source: Optional[dict],
+    recipe: dict,
+    build: Callable[[], vtk.vtkImageData],
+) -> vtk.vtkImageData:
+    return vtk_cache.image(source, recipe, build)
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import os
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import vtk
+from vtk.util import numpy_support
+
+from constants import VTK_BINARY_OUTPUT, VTK_DATASET_CACHE_SIZE
+from conversion_pool import ConvertedArrays
+
+DATASET_KINDS = ("scalar", "vector", "domain")
+
+DatasetKey = tuple[str, Optional[str]]
+DatasetBuild = Callable[[Optional[str]], vtk.vtkImageData]
+ExportProgress = Callable[[int, int, str], None]
+DatasetPrefetch = Callable[
+    [Sequence[DatasetKey], Optional[ExportProgress]],
+    dict[DatasetKey, vtk.vtkImageData],
+]
+DatasetSources = tuple[
+    dict[str, vtk.vtkImageData],
+    dict[str, tuple[DatasetBuild, tuple[Optional[str], ...]]],
+    dict[DatasetKey, vtk.vtkImageData],
+    Optional[DatasetPrefetch],
+]
+
+
+def _spacing_values(spacing: Sequence[str]) -> tuple[float, float, float]:
+    return tuple(float(value or 1) for value in spacing)
+
+
+def _point_array(values: np.ndarray, name: str, array_type: Optional[int] = None) -> vtk.vtkDataArray:
+    values = np.ascontiguousarray(values)
+    array = numpy_support.numpy_to_vtk(values, deep=False, array_type=array_type)
+    array.SetName(name)
+    return array
+
+
+def _image(
+    dims: Sequence[int],
+    spacing: Sequence[str],
+    origin: Sequence[float] = (0, 0, 0),
+    start: Sequence[int] = (0, 0, 0),
+) -> vtk.vtkImageData:
+    image = vtk.vtkImageData()
+    image.SetExtent(*(bound for axis in range(3) for bound in (int(start[axis]), int(start[axis]) + int(dims[axis]) - 1)))
+    image.SetOrigin(*origin)
+    image.SetSpacing(*_spacing_values(spacing))
+    return image
+
+
+def converted_image(
+    converted: ConvertedArrays,
+    spacing: Sequence[str],
+    scalar_name: str = "scalar",
+    start: Sequence[int] = (0, 0, 0),
+) -> vtk.vtkImageData:
+    dims, arrays = converted
+    image = _image(dims, spacing, start=start)
+    point_data = image.GetPointData()
+    if "scalar" in arrays:
+        point_data.SetScalars(_point_array(arrays["scalar"], scalar_name))
+    else:
+        point_data.SetScalars(_point_array(arrays["Magnitude"], "Magnitude"))
+        point_data.SetVectors(_point_array(arrays["vector"], "vector"))
+        point_data.AddArray(_point_array(arrays["RGB"], "RGB"))
+    return image
+
+
+def array_image(image: vtk.vtkImageData, array_name: Optional[str]) -> vtk.vtkImageData:
+    if not array_name or image.GetPointData().GetArray(array_name) is None:
+        return image
+    selected = vtk.vtkImageData()
+    selected.CopyStructure(image)
+    selected.GetPointData().SetScalars(image.GetPointData().GetArray(array_name))
+    return selected
+
+
+def domain_image(
+    labels: np.ndarray,
+    dims: Sequence[int],
+    spacing: Sequence[str],
+    start: Sequence[int] = (0, 0, 0),
+) -> vtk.vtkImageData:
+    image = _image(dims, spacing, (-1, -1, -1), start)
+    image.GetPointData().SetScalars(_point_array(labels.astype(np.int32).ravel(), "domain"))
+    return image
+
+
+def register_dataset(view, kind: str, name: str, image: vtk.vtkImageData) -> None:
+    forget_dataset(view, name)
+    view.vtkDatasets[kind][name] = image
+
+
+def register_dataset_builder(
+    view,
+    kind: str,
+    name: str,
+    build: DatasetBuild,
+    array_names: Sequence[Optional[str]] = (None,),
+) -> None:
+    forget_dataset(view, name)
+    view.vtkDatasetBuilders[kind][name] = (build, tuple(array_names))
+
+
+def register_dataset_prefetch(view, kind: str, prefetch: DatasetPrefetch) -> None:
+    view.vtkDatasetPrefetch[kind] = prefetch
+
+
+def cache_dataset(view, name: str, array_name: Optional[str], image: vtk.vtkImageData) -> None:
+    cache = view.vtkDatasetCache
+    cache[(name, array_name)] = image
+    cache.move_to_end((name, array_name))
+    while len(cache) > VTK_DATASET_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _drop_cached(view, names) -> None:
+    for key in [key for key in view.vtkDatasetCache if key[0] in names]:
+        del view.vtkDatasetCache[key]
+
+
+def clear_datasets(view, kind: str) -> None:
+    _drop_cached(view, set(view.vtkDatasetBuilders[kind]))
+    view.vtkDatasets[kind].clear()
+    view.vtkDatasetBuilders[kind].clear()
+    view.vtkDatasetPrefetch.pop(kind, None)
+
+
+def forget_dataset(view, name: str) -> None:
+    for datasets in view.vtkDatasets.values():
+        datasets.pop(name, None)
+    for builders in view.vtkDatasetBuilders.values():
+        builders.pop(name, None)
+    _drop_cached(view, {name})
+
+
+def _dataset_builder(view, name: str) -> Optional[tuple[DatasetBuild, tuple[Optional[str], ...]]]:
+    for builders in view.vtkDatasetBuilders.values():
+        if name in builders:
+            return builders[name]
+    return None
+
+
+def _built_dataset(view, name: str, array_name: Optional[str]) -> Optional[vtk.vtkImageData]:
+    builder = _dataset_builder(view, name)
+    if builder is None:
+        return None
+    build, array_names = builder
+    if array_name not in array_names:
+        array_name = array_names[0]
+    key = (name, array_name)
+    image = view.vtkDatasetCache.get(key)
+    if image is None:
+        image = build(array_name)
+    cache_dataset(view, name, array_name, image)
+    return image
+
+
+def built_datasets(
+    sources: DatasetSources,
+    keys: Sequence[DatasetKey],
+    progress: Optional[ExportProgress] = None,
+) -> dict[DatasetKey, vtk.vtkImageData]:
+    _images, builders, cache, prefetch = sources
+    images = {key: cache[key] for key in keys if key in cache}
+    missing = [key for key in keys if key not in images]
+    if prefetch is not None and missing:
+        images.update(prefetch(missing, progress))
+    for name, array_name in missing:
+        if (name, array_name) not in images:
+            images[(name, array_name)] = builders[name][0](array_name)
+    return images
+
+
+def has_dataset(view, name: str) -> bool:
+    if not name:
+        return False
+    if any(name in datasets for datasets in view.vtkDatasets.values()):
+        return True
+    if _dataset_builder(view, name) is not None:
+        return True
+    return os.path.isfile(name)
+
+
+def dataset_identity(view, name: str, image: vtk.vtkImageData) -> tuple:
+    registered = any(name in datasets for datasets in view.vtkDatasets.values())
+    if not registered and _dataset_builder(view, name) is None and os.path.isfile(name):
+        stat = os.stat(name)
+        return ("file", os.path.abspath(name), stat.st_mtime_ns, stat.st_size)
+    return ("image", id(image))
+
+
+def dataset_image(view, name: str, array_name: Optional[str] = None) -> Optional[vtk.vtkImageData]:
+    if not name:
+        return None
+    for datasets in view.vtkDatasets.values():
+        if name in datasets:
+            return datasets[name]
+    image = _built_dataset(view, name, array_name)
+    if image is not None:
+        return image
+    if not os.path.isfile(name):
+        return None
+    reader = vtk.vtkStructuredPointsReader()
+    reader.SetFileName(name)
+    reader.ReadAllScalarsOn()
+    reader.ReadAllVectorsOn()
+    reader.Update()
+    return reader.GetOutput()
+
+
+def dataset_source(
+    view,
+    name: str,
+    spacing: Sequence[str],
+    array_name: Optional[str] = None,
+) -> Optional[vtk.vtkTrivialProducer]:
+    image = dataset_image(view, name, array_name)
+    if image is None:
+        return None
+    image.SetSpacing(*_spacing_values(spacing))
+    producer = vtk.vtkTrivialProducer()
+    producer.SetOutput(array_image(image, array_name))
+    producer.Update()
+    return producer
+
+
+def write_dataset(image: vtk.vtkImageData, out_path: str, binary: bool = VTK_BINARY_OUTPUT) -> None:
+    writer = vtk.vtkStructuredPointsWriter()
+    writer.SetInputData(image)
+    writer.SetFileName(out_path)
+    if binary:
+        writer.SetFileTypeToBinary()
+    else:
+        writer.SetFileTypeToASCII()
+    writer.Write()
+
+
+def _complete_image(images: Sequence[vtk.vtkImageData], array_names: Sequence[Optional[str]]) -> vtk.vtkImageData:
+    image = vtk.vtkImageData()
+    image.ShallowCopy(images[0])
+    for part, array_name in zip(images[1:], array_names[1:]):
+        image.GetPointData().AddArray(part.GetPointData().GetArray(array_name))
+    return image
+
+
+def export_sources(view) -> list[DatasetSources]:
+    return [
+        (
+            dict(view.vtkDatasets[kind]),
+            dict(view.vtkDatasetBuilders[kind]),
+            dict(view.vtkDatasetCache),
+            view.vtkDatasetPrefetch.get(kind),
+        )
+        for kind in DATASET_KINDS
+    ]
+
+
+def export_datasets(
+    sources: Sequence[DatasetSources],
+    directory: str,
+    spacing: Sequence[str],
+    progress: Optional[ExportProgress] = None,
+) -> list[str]:
+    outputs = []
+    for kind_sources in sources:
+        images = dict(kind_sources[0])
+        builders = kind_sources[1]
+        keys = [(name, array_name) for name, (_build, array_names) in builders.items() for array_name in array_names]
+        built = built_datasets(kind_sources, keys, progress)
+        for name, (_build, array_names) in builders.items():
+            images[name] = _complete_image([built[(name, array_name)] for array_name in array_names], array_names)
+        outputs.extend(images.items())
+    written = []
+    for index, (name, image) in enumerate(outputs):
+        if progress is not None:
+            progress(index, len(outputs), "Writing VTK files...")
+        out_path = os.path.join(directory, os.path.basename(name))
+        exported = vtk.vtkImageData()
+        exported.ShallowCopy(image)
+        exported.SetSpacing(*_spacing_values(spacing))
+        write_dataset(exported, out_path)
+        written.append(out_path)
+    return written
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import os
 from typing import Optional
 
+import numpy as np
 import vtk
+from vtk.util import numpy_support
 
-from color_utils import get_rgb
+from color_utils import get_rgb_array
+from data_io_ops import vtk_spacing
+from vtk_dataset_ops import dataset_source
 
 
 def update_vtk(view, scalarname: str, vectorname: str) -> None:
@@ -38,20 +41,17 @@ def update_vtk(view, scalarname: str, vectorname: str) -> None:
     renderer.AddActor(view.actorScalar)
     renderer.AddActor(view.actorVector)
 
-    if fileNameScalar and os.path.isfile(fileNameScalar) and view.scalar_CB.isChecked():
-        readerScalarOrigin = vtk.vtkStructuredPointsReader()
-        readerScalarOrigin.SetFileName(fileNameScalar)
-        readerScalarOrigin.Update()
-        readerScalarOrigin.GetOutput().SetSpacing(
-            float(view.rescaleX_LE.text() or 1),
-            float(view.rescaleY_LE.text() or 1),
-            float(view.rescaleZ_LE.text() or 1),
-        )
-        scalar_range = readerScalarOrigin.GetOutput().GetPointData().GetScalars().GetRange()
+    readerScalarOrigin = None
+    if view.scalar_CB.isChecked():
+        scalar_array = view.scalarChoice.currentText() if view.scalarChoice.count() else None
+        readerScalarOrigin = dataset_source(view, fileNameScalar, vtk_spacing(view), scalar_array)
+    if readerScalarOrigin is not None:
+        scalarImage = readerScalarOrigin.GetOutputDataObject(0)
+        scalar_range = scalarImage.GetPointData().GetScalars().GetRange()
 
         readerScalar = vtk.vtkExtractVOI()
         readerScalar.SetInputConnection(readerScalarOrigin.GetOutputPort())
-        scalar_extent = tuple(int(v) for v in readerScalarOrigin.GetOutput().GetExtent())
+        scalar_extent = tuple(int(v) for v in scalarImage.GetExtent())
         if view.extract_CB.checkState():
             scalar_voi = view._get_clamped_extraction_voi(scalar_extent)
             readerScalar.SetVOI(*scalar_voi)
@@ -131,22 +131,18 @@ def update_vtk(view, scalarname: str, vectorname: str) -> None:
         view.outlineScalarActor.GetProperty().SetLineWidth(view.outlineWidth)
         renderer.AddActor(view.outlineScalarActor)
 
-    if fileNameVector and os.path.isfile(fileNameVector) and view.vector_CB.isChecked():
-        if not view.updateFlag:
-            view.readerVectorOrigin.ReadAllVectorsOn()
-            view.readerVectorOrigin.SetFileName(fileNameVector)
-        view.readerVectorOrigin.Update()
-        view.readerVectorOrigin.GetOutput().SetSpacing(
-            float(view.rescaleX_LE.text() or 1),
-            float(view.rescaleY_LE.text() or 1),
-            float(view.rescaleZ_LE.text() or 1),
-        )
-        vectors = view.readerVectorOrigin.GetOutput().GetPointData().GetVectors()
+    readerVectorOrigin = None
+    if view.vector_CB.isChecked():
+        readerVectorOrigin = dataset_source(view, fileNameVector, vtk_spacing(view))
+    if readerVectorOrigin is not None:
+        view.readerVectorOrigin = readerVectorOrigin
+        vectorImage = readerVectorOrigin.GetOutputDataObject(0)
+        vectors = vectorImage.GetPointData().GetVectors()
         if vectors is not None:
             vector_range = list(vectors.GetRange(-1))
         else:
             vector_range = [0.0, 0.0]
-        view.readerVectorOrigin.GetOutput().GetPointData().SetActiveVectors("vector")
+        vectorImage.GetPointData().SetActiveVectors("vector")
 
         readerVector = vtk.vtkExtractVOI()
         readerVector.SetInputConnection(view.readerVectorOrigin.GetOutputPort())
@@ -155,7 +151,7 @@ def update_vtk(view, scalarname: str, vectorname: str) -> None:
             int(view.yDelta_LE.text() or 1),
             int(view.zDelta_LE.text() or 1),
         )
-        vector_extent = tuple(int(v) for v in view.readerVectorOrigin.GetOutput().GetExtent())
+        vector_extent = tuple(int(v) for v in vectorImage.GetExtent())
         if view.extract_CB.checkState():
             vector_voi = view._get_clamped_extraction_voi(vector_extent)
             readerVector.SetVOI(*vector_voi)
@@ -370,14 +366,9 @@ def update_vtk(view, scalarname: str, vectorname: str) -> None:
     rgb.SetName("RGB1")
     normals = vectorRTContour.GetOutput().GetPointData().GetNormals()
     if normals is not None:
-        for i in range(normals.GetNumberOfTuples()):
-            normal = normals.GetTuple(i)
-            rgb_value = get_rgb(normal[0], normal[1], normal[2], [0, 1], [-1, 1])
-            rgb.InsertNextTuple3(
-                int(rgb_value[0]),
-                int(rgb_value[1]),
-                int(rgb_value[2]),
-            )
+        rgb_values = get_rgb_array(numpy_support.vtk_to_numpy(normals), [0, 1], [-1, 1])
+        rgb.DeepCopy(numpy_support.numpy_to_vtk(rgb_values.astype(np.uint8), deep=True))
+        rgb.SetName("RGB1")
     vectorRTContour.GetOutput().GetPointData().AddArray(rgb)
     vectorRTContour.Update()
 